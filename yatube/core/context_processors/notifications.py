@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from posts.notifications import unread_count
+
+
+def unread_notifications(request):
+    """Счётчик непрочитанных уведомлений; запрос только при обращении."""
+    if not request.user.is_authenticated:
+        return {}
+    return {
+        'unread_notifications': SimpleLazyObject(
+            lambda: unread_count(request.user)
+        )
+    }
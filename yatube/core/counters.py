@@ -0,0 +1,92 @@
+import atexit
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+
+_background_flush = False
+
+
+def start_background_flush():
+    """Включает фоновый сброс счётчиков; вызывается из yatube.wsgi.
+
+    Тесты и команды manage.py его не включают и сбрасывают буфер сами.
+    """
+    global _background_flush
+    _background_flush = True
+
+
+class WriteBehindCounter:
+    """Буфер приращений счётчика с отложенной пакетной записью в базу.
+
+    Приращения копятся в памяти процесса и сбрасываются одной транзакцией,
+    когда в буфере набирается flush_size записей, а при включённом фоновом
+    сбросе ещё и потоком-таймером раз в flush_interval секунд. При обычной
+    остановке остаток сбрасывается через atexit, при аварийной (SIGKILL)
+    теряется не больше одного интервала.
+    """
+
+    def __init__(self, model, field_name, flush_size=500, flush_interval=10):
+        self.model = model
+        self.field_name = field_name
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._deltas = Counter()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def incr(self, pk, amount=1):
+        if _background_flush and self._timer is None:
+            self.start()
+        with self._lock:
+            self._deltas[pk] += amount
+            flush_due = len(self._deltas) >= self.flush_size
+        if flush_due:
+            self.flush()
+
+    def start(self):
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Thread(
+                target=self._flush_periodically,
+                name=f'flush-{self.model.__name__}-{self.field_name}',
+                daemon=True,
+            )
+        atexit.register(self.flush)
+        self._timer.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+    def pending(self, pk):
+        with self._lock:
+            return self._deltas.get(pk, 0)
+
+    def flush(self):
+        """Записывает накопленное, объединяя строки с равным приращением."""
+        with self._lock:
+            deltas, self._deltas = self._deltas, Counter()
+        if not deltas:
+            return 0
+        pks_by_amount = defaultdict(list)
+        for pk, amount in deltas.items():
+            pks_by_amount[amount].append(pk)
+        try:
+            with transaction.atomic():
+                for amount, pks in pks_by_amount.items():
+                    self.model.objects.filter(pk__in=pks).update(
+                        **{self.field_name: F(self.field_name) + amount}
+                    )
+        except DatabaseError:
+            with self._lock:
+                self._deltas.update(deltas)
+            return 0
+        return len(deltas)
@@ -0,0 +1,54 @@
+from django.core.cache import cache as fragment_cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template.defaultfilters import date
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.timezone import template_localtime
+from jinja2 import Environment
+from markupsafe import Markup
+from sorl.thumbnail.templatetags.thumbnail import safe_filter
+from sorl.thumbnail.shortcuts import get_thumbnail
+
+from .templatetags.user_filters import addclass
+
+
+def url(viewname, *args, **kwargs):
+    return reverse(viewname, args=args or None, kwargs=kwargs or None)
+
+
+@safe_filter(error_output=None)
+def thumbnail(file, geometry, **options):
+    """Аналог {% thumbnail ... as im %}: None, если файла нет."""
+    if not file:
+        return None
+    return get_thumbnail(file, geometry, **options)
+
+
+def date_filter(value, arg=None):
+    """Фильтр date: как в шаблонах Django, с переводом в местное время."""
+    return date(template_localtime(value), arg)
+
+
+def cache(timeout, fragment_name, *vary_on, caller):
+    """Аналог {% cache %} для {% call cache(...) %}, ключи совпадают."""
+    key = make_template_fragment_key(fragment_name, vary_on)
+    value = fragment_cache.get(key)
+    if value is None:
+        value = caller()
+        fragment_cache.set(key, value, timeout)
+    return Markup(value)
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({
+        'url': url,
+        'static': static,
+        'thumbnail': thumbnail,
+        'cache': cache,
+    })
+    env.filters.update({
+        'addclass': addclass,
+        'date': date_filter,
+    })
+    return env
@@ -0,0 +1,29 @@
+import re
+
+from django.template.loaders.filesystem import Loader as FilesystemLoader
+
+INDENT = re.compile(r'\n[ \t]+')
+BLANK_LINES = re.compile(r'\n{2,}')
+PRESERVE_TAGS = ('<pre', '<textarea')
+
+
+def strip_indentation(contents):
+    """Убирает отступы и пустые строки; переводы строк остаются."""
+    if any(tag in contents for tag in PRESERVE_TAGS):
+        return contents
+    contents = INDENT.sub('\n', contents)
+    return BLANK_LINES.sub('\n', contents).lstrip(' \t')
+
+
+class WhitespaceStrippingLoader(FilesystemLoader):
+    """Загрузчик шаблонов из DIRS, срезающий отступы в .html при чтении.
+
+    Вместе с cached.Loader минификация выполняется один раз на процесс,
+    а не на каждый ответ. Шаблоны с <pre> и <textarea> не трогаются.
+    """
+
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if origin.name.endswith('.html'):
+            return strip_indentation(contents)
+        return contents
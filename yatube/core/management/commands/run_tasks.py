@@ -0,0 +1,39 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from core.tasks import claim_tasks, run_task
+
+WORKERS = 4
+POLL_INTERVAL = 1.0
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди core.Task.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=WORKERS,
+            help='Сколько задач выполнять параллельно.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, в секундах.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                claimed = claim_tasks(workers * 2)
+                for status in pool.map(run_task, claimed):
+                    self.stderr.write(f'Задача завершена: {status}')
+                if options['once'] and not claimed:
+                    return
+                if not claimed:
+                    time.sleep(options['poll_interval'])
@@ -0,0 +1,80 @@
+import os
+import re
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Файл, из которого читается только отрезок [start, start + length).
+
+    fileno() отдаёт дескриптор исходного файла, уже сдвинутого на start:
+    gunicorn по нему отправит отрезок через sendfile, ограничив его
+    заголовком Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Разбирает один диапазон Range: (start, end) включительно.
+
+    None — заголовка нет или диапазонов несколько, отдаём файл целиком.
+    ValueError — диапазон за пределами файла.
+    """
+    match = RANGE_RE.match(header or '')
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if not length:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def file_etag(stat):
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def is_private(path, private_prefixes):
+    return any(path.startswith(prefix) for prefix in private_prefixes)
+
+
+def media_path(root, path):
+    """Абсолютный путь внутри root или None, если путь выходит за него."""
+    full_path = os.path.realpath(os.path.join(root, path))
+    root = os.path.realpath(root)
+    if os.path.commonpath([root, full_path]) != root:
+        return None
+    return full_path
+
+
+def media_name(root, full_path):
+    """Имя файла относительно root через «/», без «.» и «..»."""
+    name = os.path.relpath(full_path, os.path.realpath(root))
+    return name.replace(os.sep, '/')
@@ -0,0 +1,99 @@
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_SIZE = 200
+COMPRESSIBLE_TYPES = (
+    'text/html',
+    'application/json',
+    'application/rss+xml',
+    'application/atom+xml',
+)
+
+
+def parse_accept_encoding(header):
+    """Кодировки из Accept-Encoding с их q: {'gzip': 1.0, 'br': 0.0}."""
+    weights = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def accepted_weight(weights, coding):
+    return weights.get(coding, weights.get('*', 0.0))
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor()
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает HTML, JSON и ленты: brotli, если он есть, иначе gzip.
+
+    Потоковые ответы сжимаются на лету.
+    """
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+        if not response.streaming and (
+            len(response.content) < COMPRESS_MIN_SIZE
+        ):
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        weights = parse_accept_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        encoding = max(
+            encodings, key=lambda coding: accepted_weight(weights, coding)
+        )
+        if accepted_weight(weights, encoding) <= 0:
+            return response
+        if response.streaming:
+            response.streaming_content = (
+                brotli_sequence(response.streaming_content)
+                if encoding == 'br'
+                else compress_sequence(response.streaming_content)
+            )
+            del response['Content-Length']
+        else:
+            compressed = (
+                brotli.compress(response.content)
+                if encoding == 'br'
+                else compress_string(response.content)
+            )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Аренда воркера до'),
+        ),
+    ]
@@ -10,3 +10,46 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Task(CreatedModel):
+    """Отложенная задача для фонового обработчика, см. core.tasks."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Имя задачи', max_length=200)
+    payload = models.TextField('Аргументы в JSON')
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток',
+        default=5
+    )
+    run_at = models.DateTimeField('Запустить не раньше')
+    locked_until = models.DateTimeField(
+        'Аренда воркера до',
+        blank=True,
+        null=True
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        indexes = (models.Index(fields=('status', 'run_at')),)
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
@@ -0,0 +1,203 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+COUNT_TIMEOUT = 60 * 5
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator без COUNT(*) на каждый запрос.
+
+    Число объектов берётся из count (денормализованный счётчик) или из кэша
+    по cache_key, ключ должен включать версию данных. С approximate_above
+    считается не больше approximate_above + 1 строки, а count_is_exact
+    говорит, точен ли результат. Устаревшее число не приводит к EmptyPage:
+    страница сверяется с фактически выбранными строками.
+    """
+
+    def __init__(self, object_list, per_page, count=None, cache_key=None,
+                 timeout=COUNT_TIMEOUT, approximate_above=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = count
+        self.cache_key = cache_key
+        self.timeout = timeout
+        self.approximate_above = approximate_above
+        self.count_is_exact = True
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        if self.cache_key is not None:
+            cached = cache.get(self.cache_key)
+            if cached is not None:
+                count, self.count_is_exact = cached
+                return count
+        return self.recount()
+
+    def recount(self):
+        if self.approximate_above is None:
+            count = self.object_list.count()
+        else:
+            count = self.object_list[:self.approximate_above + 1].count()
+        self.count_is_exact = (
+            self.approximate_above is None or count <= self.approximate_above
+        )
+        if self.cache_key is not None:
+            cache.set(
+                self.cache_key, (count, self.count_is_exact), self.timeout
+            )
+        self.count = count
+        self.__dict__.pop('num_pages', None)
+        return count
+
+    def validate_number(self, number):
+        """Верхнюю границу проверяет page() по выбранным строкам."""
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы должен быть целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            # Число устарело в большую сторону: пересчитываем и
+            # показываем настоящую последнюю страницу.
+            self.recount()
+            return self.page(min(number - 1, self.num_pages))
+        seen = bottom + len(rows)
+        if len(rows) <= self.per_page:
+            # Последняя страница: число объектов известно точно.
+            self.set_count(seen, exact=True)
+        elif seen > self.count:
+            self.set_count(seen, exact=False)
+        return self._get_page(rows[:self.per_page], number, self)
+
+    def set_count(self, count, exact):
+        self.count = count
+        self.count_is_exact = exact
+        self.__dict__.pop('num_pages', None)
+        if exact and self.cache_key is not None:
+            cache.set(self.cache_key, (count, exact), self.timeout)
+
+
+def elided_page_range(number, num_pages, on_each_side=2, on_ends=1,
+                      exact=True):
+    """Номера страниц: края, окно вокруг текущей и None на месте пропусков.
+
+    Пропуск в одну страницу заменяется самой страницей. При неточном числе
+    объектов (exact=False) последние страницы не показываются: их номера
+    могут не существовать.
+    """
+    start = max(number - on_each_side, 1)
+    stop = min(number + on_each_side, num_pages)
+    pages = list(range(1, min(on_ends, start - 1) + 1))
+    pages.extend(gap(pages[-1] if pages else 0, start))
+    pages.extend(range(start, stop + 1))
+    if not exact:
+        if stop < num_pages:
+            pages.append(None)
+        return pages
+    tail_start = max(num_pages - on_ends + 1, stop + 1)
+    pages.extend(gap(stop, tail_start))
+    pages.extend(range(tail_start, num_pages + 1))
+    return pages
+
+
+def gap(last, next_page):
+    """Что поставить между страницами last и next_page."""
+    if next_page - last <= 1:
+        return []
+    if next_page - last == 2:
+        return [last + 1]
+    return [None]
+
+
+class KeysetPage:
+    """Страница выборки, постранично разбитой по курсору."""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(values):
+    values = [
+        value.isoformat() if isinstance(value, (date, datetime)) else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(
+        json.dumps(values).encode()
+    ).decode()
+
+
+def decode_cursor(cursor, model, field_names):
+    """Возвращает значения полей из курсора или None, если он испорчен."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(field_names):
+            return None
+        return [
+            model._meta.get_field(name).to_python(value)
+            for name, value in zip(field_names, values)
+        ]
+    except (binascii.Error, ValueError, TypeError, ValidationError):
+        return None
+
+
+def keyset_filter(ordering, values):
+    """Условие «строго после курсора» для сортировки по нескольким полям."""
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[index]})
+        for prev_field, prev_value in zip(ordering[:index], values):
+            step &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= step
+    return condition
+
+
+def keyset_paginate(queryset, ordering, per_page, cursor=None):
+    """Отдаёт страницу без OFFSET и COUNT(*).
+
+    Последнее поле ordering должно быть уникальным (обычно id),
+    иначе записи с одинаковыми значениями могут потеряться на границе.
+    """
+    field_names = [field.lstrip('-') for field in ordering]
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, field_names)
+        if values is not None:
+            queryset = queryset.filter(keyset_filter(ordering, values))
+    object_list = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        last = object_list[-1]
+        next_cursor = encode_cursor(
+            [getattr(last, name) for name in field_names]
+        )
+    return KeysetPage(object_list, next_cursor)
@@ -0,0 +1,52 @@
+import time
+
+from django.core.cache import cache
+
+
+class TokenBucket:
+    """Ограничитель частоты «корзина с жетонами» в общем кэше.
+
+    В корзине помещается capacity жетонов, каждая попытка забирает один,
+    за секунду возвращается refill_rate жетонов. Состояние хранится в кэше:
+    лимит общий для всех процессов, только если кэш общий (memcached,
+    Redis), с LocMemCache у каждого процесса своя корзина. Чтение и запись
+    не атомарны: при гонке может пройти несколько лишних попыток, для
+    защиты от перебора этого достаточно.
+    """
+
+    def __init__(self, name, capacity, refill_rate):
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.timeout = int(capacity / refill_rate) + 1
+
+    def cache_key(self, key):
+        return f'ratelimit:{self.name}:{key}'
+
+    def _refill(self, state, now):
+        if state is None:
+            return self.capacity
+        tokens, updated = state
+        return min(
+            self.capacity, tokens + (now - updated) * self.refill_rate
+        )
+
+    def consume(self, key, tokens=1):
+        """Забирает жетоны; False, если их не хватает."""
+        cache_key = self.cache_key(key)
+        now = time.time()
+        available = self._refill(cache.get(cache_key), now)
+        allowed = available >= tokens
+        if allowed:
+            available -= tokens
+        cache.set(cache_key, (available, now), self.timeout)
+        return allowed
+
+    def retry_after(self, key, tokens=1):
+        """Сколько секунд ждать, пока накопится нужное число жетонов."""
+        available = self._refill(cache.get(self.cache_key(key)), time.time())
+        missing = max(0, tokens - available)
+        return int(missing / self.refill_rate + 0.999)
+
+    def reset(self, key):
+        cache.delete(self.cache_key(key))
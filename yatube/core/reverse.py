@@ -0,0 +1,101 @@
+import re
+from urllib.parse import quote
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import (NoReverseMatch, get_script_prefix, get_urlconf,
+                         reverse)
+from django.utils.http import RFC3986_SUBDELIMS
+
+# Цифры подходят под любой конвертер: int, slug, str и path.
+SLOT = '918273645546372819{}'
+SAFE = RFC3986_SUBDELIMS + '/~:@'
+INT_VALUE = re.compile(r'[0-9]+')
+SLUG_VALUE = re.compile(r'[-a-zA-Z0-9_]+')
+STR_VALUE = re.compile(r'[^/]+')
+
+_templates = {}
+
+
+def reverse_slots(viewname, positional, names, values):
+    return reverse(
+        viewname,
+        args=values[:positional] or None,
+        kwargs=dict(zip(names, values[positional:])) or None,
+    )
+
+
+class UrlTemplate:
+    """Адрес маршрута как строка формата: reverse() один раз на маршрут.
+
+    Для каждого аргумента заранее выясняется, какие значения принимает
+    его конвертер. Значение, которое конвертер бы отверг, уходит в обычный
+    reverse(), поэтому результат всегда совпадает с ним.
+    """
+
+    def __init__(self, viewname, positional, names):
+        self.viewname = viewname
+        self.positional = positional
+        self.names = names
+        slots = [
+            SLOT.format(index) for index in range(positional + len(names))
+        ]
+        url = reverse_slots(viewname, positional, names, slots)
+        for index, slot in enumerate(slots):
+            url = url.replace(slot, '{%d}' % index)
+        self.format = url
+        self.patterns = [
+            self.probe(slots, index) for index in range(len(slots))
+        ]
+
+    def probe(self, slots, index):
+        for probe, pattern in (('a', INT_VALUE), ('a b', SLUG_VALUE)):
+            values = slots[:index] + [probe] + slots[index + 1:]
+            try:
+                reverse_slots(
+                    self.viewname, self.positional, self.names, values
+                )
+            except NoReverseMatch:
+                return pattern
+        return STR_VALUE
+
+    def render(self, values):
+        values = [str(value) for value in values]
+        for value, pattern in zip(values, self.patterns):
+            if not pattern.fullmatch(value):
+                return reverse_slots(
+                    self.viewname, self.positional, self.names, values
+                )
+        return self.format.format(
+            *(quote(value, safe=SAFE) for value in values)
+        )
+
+
+def cached_reverse(viewname, *args, **kwargs):
+    """reverse() с запоминанием шаблона адреса для каждого маршрута.
+
+    Шаблоны строятся при первом обращении и живут до перезапуска процесса
+    или смены ROOT_URLCONF; ключ учитывает urlconf запроса и SCRIPT_NAME.
+    """
+    names = tuple(sorted(kwargs))
+    key = (get_urlconf(), get_script_prefix(), viewname, len(args), names)
+    template = _templates.get(key)
+    if template is None:
+        try:
+            template = UrlTemplate(viewname, len(args), names)
+        except NoReverseMatch:
+            template = False
+        _templates[key] = template
+    if template is False:
+        return reverse(viewname, args=args or None, kwargs=kwargs or None)
+    return template.render([*args, *(kwargs[name] for name in names)])
+
+
+def clear_cached_urls():
+    _templates.clear()
+
+
+@receiver(setting_changed)
+def clear_on_urlconf_change(setting, **kwargs):
+    if setting == 'ROOT_URLCONF':
+        clear_cached_urls()
@@ -0,0 +1,136 @@
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from wsgiref.headers import Headers
+
+from django.conf import settings
+
+from .middleware import accepted_weight, parse_accept_encoding
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+DEFAULT_MAX_AGE = 60
+BLOCK_SIZE = 64 * 1024
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+MANIFEST_NAME = 'staticfiles.json'
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.variants = {
+            encoding: StaticFile(path + suffix, immutable)
+            for encoding, suffix in ENCODINGS
+            if os.path.isfile(path + suffix)
+        }
+
+    def choose(self, accept_encoding):
+        """Сжатый вариант с наибольшим q у клиента, иначе сам файл."""
+        weights = parse_accept_encoding(accept_encoding)
+        encoding = max(
+            self.variants,
+            key=lambda coding: accepted_weight(weights, coding),
+            default=None,
+        )
+        if encoding is None or accepted_weight(weights, encoding) <= 0:
+            return None, self
+        return encoding, self.variants[encoding]
+
+
+class StaticFilesApp:
+    """WSGI-обёртка, отдающая собранную статику мимо Django.
+
+    Файлы из STATIC_ROOT индексируются один раз при запуске процесса.
+    Хешированные имена из манифеста отдаются с кэшем на год, тело
+    передаётся через wsgi.file_wrapper: gunicorn отправляет его sendfile.
+    Запросы под STATIC_URL, для которых файла нет, получают 404 сразу.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = root or settings.STATIC_ROOT
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = self.scan()
+
+    def hashed_names(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST_NAME)) as manifest:
+                return set(json.load(manifest)['paths'].values())
+        except (OSError, ValueError, KeyError):
+            return set()
+
+    def scan(self):
+        files = {}
+        if not self.root or not os.path.isdir(self.root):
+            return files
+        hashed = self.hashed_names()
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                files[self.prefix + name] = StaticFile(path, name in hashed)
+        return files
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(self.prefix):
+            return self.application(environ, start_response)
+        static_file = self.files.get(path)
+        if static_file is None:
+            return self.respond(start_response, '404 Not Found', [])
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return self.respond(
+                start_response, '405 Method Not Allowed',
+                [('Allow', 'GET, HEAD')]
+            )
+        encoding, variant = static_file.choose(
+            environ.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        headers = Headers([
+            ('Content-Type', static_file.content_type),
+            ('Last-Modified', static_file.last_modified),
+            ('ETag', variant.etag),
+            ('Cache-Control', self.cache_control(static_file)),
+        ])
+        if static_file.variants:
+            headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        if environ.get('HTTP_IF_NONE_MATCH') == variant.etag:
+            return self.respond(
+                start_response, '304 Not Modified', headers.items()
+            )
+        headers['Content-Length'] = str(variant.size)
+        start_response('200 OK', headers.items())
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper', read_blocks)
+        return file_wrapper(open(variant.path, 'rb'), BLOCK_SIZE)
+
+    def cache_control(self, static_file):
+        if static_file.immutable:
+            return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        return f'public, max-age={DEFAULT_MAX_AGE}'
+
+    def respond(self, start_response, status, headers):
+        start_response(status, list(headers))
+        return []
+
+
+def read_blocks(file, block_size):
+    with file:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                return
+            yield block
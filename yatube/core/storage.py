@@ -0,0 +1,59 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.map',
+)
+MIN_COMPRESS_SIZE = 256
+
+
+def compress_file(path):
+    """Пишет рядом с файлом .gz и, если есть brotli, .br варианты.
+
+    Вариант сохраняется, только если он меньше исходника.
+    """
+    with open(path, 'rb') as source:
+        content = source.read()
+    if len(content) < MIN_COMPRESS_SIZE:
+        return []
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content)))
+    written = []
+    for suffix, compressed in variants:
+        if len(compressed) >= len(content):
+            continue
+        with open(path + suffix, 'wb') as target:
+            target.write(compressed)
+        written.append(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хешированные имена плюс сжатые при сборке копии для core.static.
+
+    Без манифеста (тесты, свежий checkout без collectstatic) отдаёт
+    исходные имена вместо ошибки.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                compress_file(self.path(name))
@@ -0,0 +1,114 @@
+import json
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+
+BACKOFF_BASE = 5
+# Дольше самой долгой задачи: по истечении аренды задачу заберёт другой.
+LEASE_TIMEOUT = timedelta(minutes=10)
+LEASE_EXPIRED = 'Воркер не завершил задачу до истечения аренды'
+
+registry = {}
+
+
+class TaskFunction:
+    def __init__(self, func, max_attempts):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.max_attempts = max_attempts
+        registry[self.name] = self
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Ставит задачу в очередь после фиксации текущей транзакции."""
+        payload = json.dumps({'args': args, 'kwargs': kwargs})
+        transaction.on_commit(lambda: Task.objects.create(
+            name=self.name,
+            payload=payload,
+            max_attempts=self.max_attempts,
+            run_at=timezone.now(),
+        ))
+
+
+def task(func=None, max_attempts=5):
+    """Регистрирует функцию как фоновую задачу: func.delay(...)."""
+    if func is None:
+        return lambda func: TaskFunction(func, max_attempts)
+    return TaskFunction(func, max_attempts)
+
+
+def reclaim_expired(now):
+    """Возвращает в очередь задачи упавших воркеров как неудачную попытку.
+
+    Если попытки кончились, задача помечается FAILED.
+    """
+    expired = Task.objects.filter(status=Task.RUNNING, locked_until__lt=now)
+    changes = {
+        'attempts': F('attempts') + 1,
+        'locked_until': None,
+        'last_error': LEASE_EXPIRED,
+    }
+    expired.filter(attempts__gte=F('max_attempts') - 1).update(
+        status=Task.FAILED, **changes
+    )
+    expired.update(status=Task.PENDING, run_at=now, **changes)
+
+
+def claim_tasks(limit):
+    """Забирает готовые задачи; гонку воркеров решает условный UPDATE.
+
+    Забранная задача арендуется на LEASE_TIMEOUT: если воркер упадёт,
+    после истечения аренды её заберёт следующий вызов claim_tasks.
+    """
+    now = timezone.now()
+    reclaim_expired(now)
+    candidates = (
+        Task.objects.filter(status=Task.PENDING, run_at__lte=now)
+        .order_by('run_at')
+        .values_list('pk', flat=True)[:limit]
+    )
+    claimed = []
+    for pk in candidates:
+        updated = Task.objects.filter(pk=pk, status=Task.PENDING).update(
+            status=Task.RUNNING, locked_until=now + LEASE_TIMEOUT
+        )
+        if updated:
+            claimed.append(pk)
+    return claimed
+
+
+def run_task(pk):
+    close_old_connections()
+    try:
+        task = Task.objects.get(pk=pk)
+        task.attempts += 1
+        try:
+            task_function = registry[task.name]
+            payload = json.loads(task.payload)
+            task_function(*payload['args'], **payload['kwargs'])
+        except Exception:
+            task.last_error = traceback.format_exc()
+            if task.attempts < task.max_attempts:
+                task.status = Task.PENDING
+                task.run_at = timezone.now() + timedelta(
+                    seconds=BACKOFF_BASE * 2 ** task.attempts
+                )
+            else:
+                task.status = Task.FAILED
+        else:
+            task.status = Task.DONE
+            task.last_error = ''
+        task.locked_until = None
+        task.save(update_fields=(
+            'status', 'attempts', 'run_at', 'last_error', 'locked_until'
+        ))
+        return task.status
+    finally:
+        close_old_connections()
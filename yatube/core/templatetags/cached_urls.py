@@ -0,0 +1,17 @@
+from django import template
+
+from core.reverse import cached_reverse
+
+register = template.Library()
+
+
+@register.simple_tag(name='cached_url')
+def cached_url_tag(viewname, *args, **kwargs):
+    """{% cached_url 'posts:profile' author.username %} — как {% url %}."""
+    return cached_reverse(viewname, *args, **kwargs)
+
+
+@register.filter(name='cached_url')
+def cached_url_filter(value, viewname):
+    """{{ author.username|cached_url:'posts:profile' }}."""
+    return cached_reverse(viewname, value)
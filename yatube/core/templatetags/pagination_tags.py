@@ -0,0 +1,18 @@
+from django import template
+
+from core.pagination import elided_page_range
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page, on_each_side=2, on_ends=1):
+    """{% page_window page_obj as pages %}: номера страниц для навигации."""
+    paginator = page.paginator
+    return elided_page_range(
+        page.number,
+        paginator.num_pages,
+        on_each_side=on_each_side,
+        on_ends=on_ends,
+        exact=getattr(paginator, 'count_is_exact', True),
+    )
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core.counters import WriteBehindCounter
+from posts.counters import most_viewed_posts, post_views
+from posts.models import Post, User
+
+
+class WriteBehindCounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Первый')
+        cls.other_post = Post.objects.create(author=cls.user, text='Второй')
+
+    def setUp(self):
+        self.counter = WriteBehindCounter(
+            Post, 'views', flush_size=100, flush_interval=3600
+        )
+
+    def test_increments_are_buffered_until_flush(self):
+        """До сброса приращения не пишутся в базу."""
+        self.counter.incr(self.post.pk)
+        self.counter.incr(self.post.pk)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+        self.assertEqual(self.counter.pending(self.post.pk), 2)
+        self.assertEqual(self.counter.flush(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+        self.assertEqual(self.counter.pending(self.post.pk), 0)
+
+    def test_flush_on_size_threshold(self):
+        """Буфер сбрасывается сам, когда набирает flush_size записей."""
+        self.counter.flush_size = 2
+        self.counter.incr(self.post.pk)
+        self.counter.incr(self.other_post.pk, 3)
+        self.assertEqual(self.counter.pending(self.other_post.pk), 0)
+        self.assertEqual(
+            list(most_viewed_posts(2)), [self.other_post, self.post]
+        )
+
+    def test_detail_count_survives_flush(self):
+        """Сброс буфера во время просмотра не уменьшает счётчик на странице."""
+        post_views.flush()
+        with mock.patch.object(post_views, 'flush_size', 1):
+            for expected in (1, 2):
+                response = self.client.get(
+                    reverse('posts:post_detail', args=[self.post.pk])
+                )
+                self.assertEqual(response.context['views'], expected)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+
+    def test_timer_starts_only_when_enabled(self):
+        """Поток сброса не запускается, пока его не включит yatube.wsgi."""
+        self.counter.incr(self.post.pk)
+        self.assertIsNone(self.counter._timer)
@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+
+from core.media import media_path
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+
+User = get_user_model()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    MEDIA_PRIVATE_PREFIXES=['private/'],
+)
+class ServeMediaTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ('posts/image.bin', 'private/image.bin'):
+            path = os.path.join(MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(CONTENT)
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_full_file_with_validators(self):
+        """Файл отдаётся целиком, на повтор по ETag — 304 с ETag и датой."""
+        response = self.guest_client.get('/media/posts/image.bin')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        validators = {
+            header: response[header] for header in ('ETag', 'Last-Modified')
+        }
+        response = self.guest_client.get(
+            '/media/posts/image.bin', HTTP_IF_NONE_MATCH=validators['ETag']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        for header, value in validators.items():
+            with self.subTest(header=header):
+                self.assertEqual(response[header], value)
+
+    def test_range_request(self):
+        """Range отдаёт только запрошенный отрезок."""
+        response = self.guest_client.get(
+            '/media/posts/image.bin', HTTP_RANGE='bytes=10-19'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(
+            b''.join(response.streaming_content), CONTENT[10:20]
+        )
+        self.assertEqual(
+            response['Content-Range'], f'bytes 10-19/{len(CONTENT)}'
+        )
+        response = self.guest_client.get(
+            '/media/posts/image.bin', HTTP_RANGE='bytes=-5'
+        )
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[-5:])
+        response = self.guest_client.get(
+            '/media/posts/image.bin', HTTP_RANGE=f'bytes={len(CONTENT)}-'
+        )
+        self.assertEqual(
+            response.status_code, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+    def test_private_media_requires_login(self):
+        """Закрытые файлы видит только вошедший пользователь."""
+        response = self.guest_client.get('/media/private/image.bin')
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        client = Client()
+        client.force_login(self.user)
+        response = client.get('/media/private/image.bin')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_private_media_after_normalization(self):
+        """Сегменты «..» и «.» не обходят проверку закрытых файлов."""
+        urls = [
+            '/media/posts/../private/image.bin',
+            '/media/./private/image.bin',
+            '/media/posts/./../private/image.bin',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_path_outside_media_root(self):
+        """Выход за MEDIA_ROOT не находит файл, отсутствующий файл — 404."""
+        self.assertIsNone(media_path(MEDIA_ROOT, '../settings.py'))
+        self.assertIsNone(media_path(MEDIA_ROOT, '/etc/passwd'))
+        response = self.guest_client.get('/media/posts/missing.bin')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(MEDIA_SENDFILE_BACKEND='x-accel-redirect')
+    def test_accel_redirect(self):
+        """За nginx Django отдаёт только заголовок X-Accel-Redirect."""
+        response = self.guest_client.get('/media/posts/image.bin')
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/image.bin'
+        )
+        self.assertEqual(response.content, b'')
@@ -0,0 +1,100 @@
+import gzip
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core.loaders import strip_indentation
+from core.middleware import CompressionMiddleware
+
+
+class CompressionMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.middleware = CompressionMiddleware(lambda request: None)
+        self.html = '<p>Пост</p>\n' * 100
+
+    def compress(self, response, request=None):
+        return self.middleware.process_response(
+            request or self.request, response
+        )
+
+    def test_html_is_gzipped(self):
+        """Большой HTML сжимается, ETag становится слабым."""
+        response = HttpResponse(self.html)
+        response['ETag'] = '"abc"'
+        response = self.compress(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(
+            gzip.decompress(response.content).decode(), self.html
+        )
+
+    def test_skipped_responses(self):
+        """Короткие ответы, картинки и клиенты без gzip не сжимаются."""
+        responses = {
+            'короткий': (HttpResponse('<p>Пост</p>'), self.request),
+            'картинка': (
+                HttpResponse(b'0' * 1000, content_type='image/png'),
+                self.request,
+            ),
+            'без gzip': (
+                HttpResponse(self.html), RequestFactory().get('/')
+            ),
+        }
+        for name, (response, request) in responses.items():
+            with self.subTest(name=name):
+                response = self.compress(response, request)
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_accept_encoding_weights(self):
+        """q=0 запрещает кодировку, «*» разрешает все остальные."""
+        cases = {
+            'gzip;q=0': False,
+            'gzip; q=0.0, identity': False,
+            '*;q=0': False,
+            'deflate, gzip;q=0.5': True,
+            '*': True,
+            'GZIP': True,
+        }
+        for header, compressed in cases.items():
+            with self.subTest(header=header):
+                request = RequestFactory().get(
+                    '/', HTTP_ACCEPT_ENCODING=header
+                )
+                response = self.compress(HttpResponse(self.html), request)
+                self.assertEqual(
+                    response.has_header('Content-Encoding'), compressed
+                )
+
+    def test_streaming_response(self):
+        """Потоковый HTML сжимается, поток архива нет."""
+        response = self.compress(StreamingHttpResponse(iter([self.html])))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)).decode(),
+            self.html,
+        )
+        archive = StreamingHttpResponse(
+            iter([b'PK']), content_type='application/zip'
+        )
+        self.assertFalse(
+            self.compress(archive).has_header('Content-Encoding')
+        )
+
+
+class StripIndentationTest(SimpleTestCase):
+    def test_indentation_removed(self):
+        """Отступы и пустые строки срезаются, разметка не меняется."""
+        source = '<div>\n    <p>\n\n      {{ text }}\n    </p>\n</div>\n'
+        self.assertEqual(
+            strip_indentation(source),
+            '<div>\n<p>\n{{ text }}\n</p>\n</div>\n',
+        )
+
+    def test_preformatted_kept(self):
+        """Шаблоны с <pre> и <textarea> остаются как есть."""
+        source = '<pre>\n    код\n</pre>'
+        self.assertEqual(strip_indentation(source), source)
@@ -0,0 +1,141 @@
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase
+
+from core.pagination import (CachedCountPaginator, elided_page_range,
+                             encode_cursor, keyset_paginate)
+from posts.models import Post, User
+
+
+class KeysetPaginateTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}') for i in range(5)
+        )
+
+    def test_pages_cover_queryset_once(self):
+        """Страницы по курсору покрывают выборку без пропусков и повторов."""
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_paginate(
+                Post.objects.all(), ('-pub_date', '-id'), 2, cursor
+            )
+            seen.extend(post.pk for post in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(
+            seen,
+            list(
+                Post.objects.order_by('-pub_date', '-id')
+                .values_list('pk', flat=True)
+            )
+        )
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный курсор не роняет страницу."""
+        for cursor in ('not-a-cursor', encode_cursor(['x'])):
+            with self.subTest(cursor=cursor):
+                page = keyset_paginate(
+                    Post.objects.all(), ('-pub_date', '-id'), 2, cursor
+                )
+                self.assertEqual(len(page), 2)
+
+
+class CachedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}') for i in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.posts = Post.objects.order_by('-pk')
+
+    def test_known_count_skips_count_query(self):
+        """С известным числом страница стоит один запрос."""
+        paginator = CachedCountPaginator(self.posts, 2, count=5)
+        with self.assertNumQueries(1):
+            page = paginator.get_page(2)
+            self.assertIsInstance(page, Page)
+            self.assertEqual(paginator.num_pages, 3)
+            self.assertTrue(page.has_next())
+
+    def test_count_is_cached_under_key(self):
+        """Число считается один раз и дальше читается из кэша."""
+        CachedCountPaginator(self.posts, 2, cache_key='count').get_page(1)
+        with self.assertNumQueries(1):
+            paginator = CachedCountPaginator(self.posts, 2, cache_key='count')
+            paginator.get_page(1)
+            self.assertEqual(paginator.count, 5)
+
+    def test_stale_low_count_keeps_pages_reachable(self):
+        """Заниженное число не прячет существующие страницы."""
+        paginator = CachedCountPaginator(self.posts, 2, count=1)
+        page = paginator.get_page(2)
+        self.assertEqual(len(page), 2)
+        self.assertTrue(page.has_next())
+        page = CachedCountPaginator(self.posts, 2, count=1).get_page(3)
+        self.assertEqual(len(page), 1)
+        self.assertFalse(page.has_next())
+        self.assertEqual(page.paginator.count, 5)
+
+    def test_stale_high_count_falls_back_to_last_page(self):
+        """Завышенное число ведёт на настоящую последнюю страницу."""
+        page = CachedCountPaginator(self.posts, 2, count=50).get_page(20)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 1)
+        self.assertEqual(page.paginator.num_pages, 3)
+
+    def test_approximate_count(self):
+        """Выше порога число неточное, пока не дошли до конца ленты."""
+        paginator = CachedCountPaginator(self.posts, 2, approximate_above=3)
+        paginator.get_page(1)
+        self.assertEqual(paginator.count, 4)
+        self.assertFalse(paginator.count_is_exact)
+        paginator = CachedCountPaginator(self.posts, 2, approximate_above=3)
+        paginator.get_page(3)
+        self.assertEqual(paginator.count, 5)
+        self.assertTrue(paginator.count_is_exact)
+
+
+class ElidedPageRangeTest(SimpleTestCase):
+    def test_window_and_ends(self):
+        """Края, окно ±2 и пропуски вместо тысяч номеров."""
+        cases = {
+            (1, 1): [1],
+            (1, 5000): [1, 2, 3, None, 5000],
+            (2500, 5000): [1, None, 2498, 2499, 2500, 2501, 2502, None, 5000],
+            (5000, 5000): [1, None, 4998, 4999, 5000],
+            (5, 10): [1, 2, 3, 4, 5, 6, 7, None, 10],
+            (3, 5): [1, 2, 3, 4, 5],
+        }
+        for (number, num_pages), expected in cases.items():
+            with self.subTest(number=number, num_pages=num_pages):
+                self.assertEqual(
+                    elided_page_range(number, num_pages), expected
+                )
+
+    def test_inexact_count_hides_last_pages(self):
+        """При неточном числе объектов хвост заменяется пропуском."""
+        self.assertEqual(
+            elided_page_range(10, 5000, exact=False),
+            [1, None, 8, 9, 10, 11, 12, None],
+        )
+
+    def test_page_window_tag(self):
+        """Навигация по 5000 страницам выводит только окно ссылок."""
+        page = Paginator(range(50000), 10).page(2500)
+        html = Template(
+            '{% load pagination_tags %}{% page_window page_obj as pages %}'
+            '{% for i in pages %}{{ i|default:"…" }} {% endfor %}'
+        ).render(Context({'page_obj': page}))
+        self.assertEqual(html, '1 … 2498 2499 2500 2501 2502 … 5000 ')
@@ -0,0 +1,31 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.ratelimit import TokenBucket
+
+
+class TokenBucketTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.bucket = TokenBucket('test', capacity=2, refill_rate=1)
+
+    def test_bucket_empties_and_refills(self):
+        """Жетоны кончаются и возвращаются со временем."""
+        with mock.patch('core.ratelimit.time.time', return_value=100):
+            self.assertTrue(self.bucket.consume('key'))
+            self.assertTrue(self.bucket.consume('key'))
+            self.assertFalse(self.bucket.consume('key'))
+            self.assertEqual(self.bucket.retry_after('key'), 1)
+        with mock.patch('core.ratelimit.time.time', return_value=101):
+            self.assertTrue(self.bucket.consume('key'))
+            self.assertFalse(self.bucket.consume('key'))
+
+    def test_keys_are_independent(self):
+        """У каждого ключа своя корзина."""
+        self.bucket.consume('key', tokens=2)
+        self.assertFalse(self.bucket.consume('key'))
+        self.assertTrue(self.bucket.consume('other'))
+        self.bucket.reset('key')
+        self.assertTrue(self.bucket.consume('key'))
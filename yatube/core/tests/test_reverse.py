@@ -0,0 +1,61 @@
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from django.urls import NoReverseMatch, reverse
+
+from core.reverse import _templates, cached_reverse, clear_cached_urls
+
+
+class CachedReverseTest(SimpleTestCase):
+    def setUp(self):
+        clear_cached_urls()
+
+    def test_matches_reverse(self):
+        """Результат совпадает с reverse для разных конвертеров."""
+        cases = (
+            ('posts:index', (), {}),
+            ('posts:profile', ('auth',), {}),
+            ('posts:profile', ('Автор 1',), {}),
+            ('posts:profile_follow', ('user.name@x+y',), {}),
+            ('posts:post_detail', (15,), {}),
+            ('posts:post_detail', (), {'post_id': 15}),
+            ('posts:group_list', ('test-group_1',), {}),
+            ('about:author', (), {}),
+        )
+        for viewname, args, kwargs in cases:
+            with self.subTest(viewname=viewname, args=args, kwargs=kwargs):
+                for _ in range(2):
+                    self.assertEqual(
+                        cached_reverse(viewname, *args, **kwargs),
+                        reverse(viewname, args=args, kwargs=kwargs),
+                    )
+
+    def test_rejected_values_raise_like_reverse(self):
+        """Значение не под конвертер уходит в reverse и даёт ту же ошибку."""
+        cached_reverse('posts:post_detail', 1)
+        for viewname, value in (
+            ('posts:post_detail', 'abc'),
+            ('posts:group_list', 'не slug'),
+            ('posts:profile', 'a/b'),
+        ):
+            with self.subTest(viewname=viewname, value=value):
+                with self.assertRaises(NoReverseMatch):
+                    cached_reverse(viewname, value)
+
+    def test_templates_reset_on_urlconf_change(self):
+        """Смена ROOT_URLCONF сбрасывает шаблоны адресов."""
+        cached_reverse('posts:index')
+        self.assertTrue(_templates)
+        with override_settings(ROOT_URLCONF='yatube.urls'):
+            self.assertFalse(_templates)
+
+    def test_tag_and_filter(self):
+        """Тег и фильтр cached_url дают тот же адрес, что и {% url %}."""
+        html = Template(
+            '{% load cached_urls %}'
+            '{% url "posts:profile" name %}|'
+            '{% cached_url "posts:profile" name %}|'
+            '{{ name|cached_url:"posts:profile" }}'
+        ).render(Context({'name': 'auth'}))
+        url, tag_url, filter_url = html.split('|')
+        self.assertEqual(tag_url, url)
+        self.assertEqual(filter_url, url)
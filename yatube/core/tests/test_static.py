@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+from wsgiref.util import setup_testing_defaults
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from core.static import IMMUTABLE_MAX_AGE, StaticFilesApp
+
+SOURCE_DIR = tempfile.mkdtemp()
+STATIC_ROOT = tempfile.mkdtemp()
+CSS = 'body { color: black; }\n' * 100
+
+
+@override_settings(
+    STATICFILES_DIRS=[SOURCE_DIR],
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_FINDERS=[
+        'django.contrib.staticfiles.finders.FileSystemFinder',
+    ],
+)
+class StaticPipelineTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(SOURCE_DIR, 'css'))
+        with open(os.path.join(SOURCE_DIR, 'css', 'site.css'), 'w') as css:
+            css.write(CSS)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.calls = []
+        cls.app = StaticFilesApp(
+            cls.fallback_app, root=STATIC_ROOT, prefix='/static/'
+        )
+        cls.hashed_path = next(
+            path for path in cls.app.files
+            if path.startswith('/static/css/site.') and path.count('.') == 2
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SOURCE_DIR, ignore_errors=True)
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def fallback_app(cls, environ, start_response):
+        cls.calls.append(environ['PATH_INFO'])
+        start_response('200 OK', [])
+        return [b'django']
+
+    def request(self, path, **environ):
+        environ['PATH_INFO'] = path
+        setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        body = b''.join(self.app(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_collectstatic_writes_compressed_variants(self):
+        """collectstatic кладёт рядом с хешированным файлом .gz копию."""
+        hashed_file = os.path.join(
+            STATIC_ROOT, self.hashed_path[len('/static/'):]
+        )
+        self.assertTrue(os.path.isfile(hashed_file + '.gz'))
+
+    def test_hashed_file_is_cached_forever(self):
+        """Хешированное имя отдаётся с кэшем на год, исходное — коротко."""
+        status, headers, body = self.request(self.hashed_path)
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(body.decode(), CSS)
+        self.assertIn(f'max-age={IMMUTABLE_MAX_AGE}', headers['Cache-Control'])
+        _, headers, _ = self.request('/static/css/site.css')
+        self.assertNotIn('immutable', headers['Cache-Control'])
+
+    def test_gzip_variant_and_not_modified(self):
+        """Клиенту с gzip уходит сжатая копия, по ETag — 304."""
+        status, headers, body = self.request(
+            self.hashed_path, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertLess(len(body), len(CSS))
+        status, _, body = self.request(
+            self.hashed_path,
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=headers['ETag'],
+        )
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+
+    def test_accept_encoding_weights(self):
+        """q=0 запрещает сжатую копию, «*» разрешает её."""
+        cases = {
+            'gzip;q=0': False,
+            'gzip; q=0.0, identity': False,
+            '*;q=0': False,
+            'identity, deflate': False,
+            'deflate, gzip;q=0.5': True,
+            '*': True,
+            'GZIP': True,
+        }
+        for header, compressed in cases.items():
+            with self.subTest(header=header):
+                _, headers, body = self.request(
+                    self.hashed_path, HTTP_ACCEPT_ENCODING=header
+                )
+                self.assertEqual('Content-Encoding' in headers, compressed)
+                self.assertEqual(body == CSS.encode(), not compressed)
+
+    def test_static_requests_never_reach_django(self):
+        """Отсутствующая статика — 404 без Django, остальное — в Django."""
+        status, _, _ = self.request('/static/missing.css')
+        self.assertEqual(status, '404 Not Found')
+        self.assertEqual(self.calls, [])
+        _, _, body = self.request('/')
+        self.assertEqual(body, b'django')
+        self.assertEqual(self.calls, ['/'])
+        self.calls.clear()
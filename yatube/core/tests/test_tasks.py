@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import claim_tasks, run_task, task
+
+calls = []
+
+
+@task
+def remember(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def explode():
+    raise ValueError('Ошибка задачи')
+
+
+def enqueue(task_function, *args):
+    return Task.objects.create(
+        name=task_function.name,
+        payload=f'{{"args": {list(args)}, "kwargs": {{}}}}',
+        max_attempts=task_function.max_attempts,
+        run_at=timezone.now(),
+    )
+
+
+class TaskWorkerTest(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_runs_pending_tasks(self):
+        """Обработчик выполняет задачи из очереди."""
+        enqueue(remember, 42)
+        call_command('run_tasks', once=True, workers=1, stderr=StringIO())
+        self.assertEqual(calls, [42])
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    def test_delay_enqueues_on_commit(self):
+        """Задача попадает в очередь только после фиксации транзакции."""
+        with transaction.atomic():
+            remember.delay(1)
+            self.assertFalse(Task.objects.exists())
+        self.assertEqual(Task.objects.get().name, remember.name)
+
+
+class TaskRunTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_failed_task_retried_with_backoff(self):
+        """Упавшая задача откладывается, а после лимита попыток — FAILED."""
+        failing = enqueue(explode)
+        run_task(failing.pk)
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, Task.PENDING)
+        self.assertGreater(failing.run_at, timezone.now())
+        self.assertIn('Ошибка задачи', failing.last_error)
+        self.assertEqual(claim_tasks(10), [])
+        run_task(failing.pk)
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, Task.FAILED)
+
+    def test_expired_lease_is_reclaimed(self):
+        """Задачу упавшего воркера забирают снова после истечения аренды."""
+        orphan = enqueue(explode)
+        self.assertEqual(claim_tasks(10), [orphan.pk])
+        self.assertEqual(claim_tasks(10), [])
+        Task.objects.filter(pk=orphan.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(claim_tasks(10), [orphan.pk])
+        orphan.refresh_from_db()
+        self.assertEqual(orphan.attempts, 1)
+        self.assertEqual(orphan.status, Task.RUNNING)
+        Task.objects.filter(pk=orphan.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(claim_tasks(10), [])
+        orphan.refresh_from_db()
+        self.assertEqual(orphan.status, Task.FAILED)
@@ -1,4 +1,19 @@
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotModified)
 from django.shortcuts import render
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .media import (RangeFile, file_etag, is_private, media_name, media_path,
+                    parse_range)
+
+MEDIA_MAX_AGE = 24 * 60 * 60
 
 
 def page_not_found(request, exception):
@@ -17,3 +32,83 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+def serve_media(request, path):
+    """Отдаёт файл из MEDIA_ROOT после проверки прав.
+
+    С фронт-сервером (MEDIA_SENDFILE_BACKEND) Django только отвечает
+    заголовком X-Accel-Redirect или X-Sendfile, байты шлёт nginx/Apache.
+    Без него файл уходит потоком FileResponse с ETag и Range.
+    """
+    full_path = media_path(settings.MEDIA_ROOT, path)
+    if full_path is None:
+        raise Http404
+    # Права проверяются по нормализованному имени: posts/../private/x
+    # и ./private/x — тот же закрытый файл, что и private/x.
+    name = media_name(settings.MEDIA_ROOT, full_path)
+    private = is_private(name, settings.MEDIA_PRIVATE_PREFIXES)
+    if private and not request.user.is_authenticated:
+        raise PermissionDenied
+    if not os.path.isfile(full_path):
+        raise Http404
+    content_type = (
+        mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    )
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    if backend == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + name
+        )
+    elif backend == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+    else:
+        response = file_response(request, full_path, content_type)
+    response['Cache-Control'] = (
+        'private, no-cache' if private
+        else f'public, max-age={MEDIA_MAX_AGE}'
+    )
+    return response
+
+
+def file_response(request, full_path, content_type):
+    stat = os.stat(full_path)
+    etag = file_etag(stat)
+    last_modified = http_date(stat.st_mtime)
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag or (
+        'HTTP_IF_NONE_MATCH' not in request.META
+        and not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime
+        )
+    ):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        response['Last-Modified'] = last_modified
+        return response
+    range_header = request.META.get('HTTP_RANGE')
+    if request.META.get('HTTP_IF_RANGE', etag) != etag:
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, stat.st_size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            RangeFile(file, start, end - start + 1),
+            content_type=content_type,
+            status=206,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    return response
@@ -0,0 +1,227 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import Http404
+
+from .models import Follow, Group, Post, User
+
+SUMMARY_TIMEOUT = 60 * 60
+FOLLOWING_TIMEOUT = 60 * 60
+GROUPS_VERSION_KEY = 'posts:groups_version'
+GROUP_DIRECTORY_KEY = 'posts:group_directory'
+GROUP_MAP_TTL = 60
+
+
+def author_summary_key(username):
+    return f'posts:author_summary:{username}'
+
+
+def author_summary(username):
+    """Шапка профиля: автор и счётчики постов и подписчиков из кэша."""
+    key = author_summary_key(username)
+    summary = cache.get(key)
+    if summary is None:
+        author = (
+            User.objects.filter(username=username)
+            .only('id', 'username', 'first_name', 'last_name')
+            .first()
+        )
+        if author is None:
+            raise Http404('Пользователь не найден')
+        summary = {
+            'author': author,
+            'posts_count': author.posts.count(),
+            'followers_count': author.following.count(),
+        }
+        cache.set(key, summary, SUMMARY_TIMEOUT)
+    return summary
+
+
+def invalidate_author_summary(username):
+    cache.delete(author_summary_key(username))
+
+
+class FollowedAuthors:
+    """Отсортированный массив id авторов с проверкой членства бинпоиском.
+
+    Занимает по 8 байт на автора и дёшево сериализуется в кэш.
+    """
+
+    __slots__ = ('ids',)
+
+    def __init__(self, author_ids=()):
+        self.ids = array('Q', sorted(author_ids))
+
+    def __contains__(self, author_id):
+        index = bisect_left(self.ids, author_id)
+        return index < len(self.ids) and self.ids[index] == author_id
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def following_version_key(user_id):
+    return f'posts:following_version:{user_id}'
+
+
+def following_version(user_id):
+    return cache.get_or_set(following_version_key(user_id), time.time_ns, None)
+
+
+def followed_author_ids(user):
+    """Авторы, на которых подписан пользователь, под текущей версией."""
+    if not user.is_authenticated:
+        return FollowedAuthors()
+    key = f'posts:following:{user.pk}:{following_version(user.pk)}'
+    followed = cache.get(key)
+    if followed is None:
+        followed = FollowedAuthors(
+            Follow.objects.filter(user=user)
+            .values_list('author_id', flat=True)
+        )
+        cache.set(key, followed, FOLLOWING_TIMEOUT)
+    return followed
+
+
+def bump_following(user_id):
+    cache.set(following_version_key(user_id), time.time_ns(), None)
+
+
+def follow_author(user, author):
+    """Подписка одной вставкой; повтор игнорируется ограничением unique."""
+    Follow.objects.bulk_create(
+        [Follow(user=user, author=author)], ignore_conflicts=True
+    )
+    bump_following(user.pk)
+    invalidate_author_summary(author.username)
+
+
+def unfollow_author(user, author):
+    """Отписка: один SELECT и один DELETE, автор у сигнала уже на руках."""
+    follow = Follow.objects.filter(user=user, author=author).first()
+    if follow is None:
+        return
+    follow.author = author
+    follow.delete()
+    bump_following(user.pk)
+    invalidate_author_summary(author.username)
+
+
+class GroupMap:
+    """Карта slug → Group в памяти процесса.
+
+    Перечитывается целиком одним запросом, когда меняется версия групп
+    в кэше или проходит GROUP_MAP_TTL секунд: так до процесса доходят и
+    правки, сделанные в процессах с собственным кэшем. Slug, которого нет
+    в карте, проверяется в базе, поэтому новая группа доступна сразу.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._expires = 0
+        self._groups = {}
+
+    def get(self, slug):
+        version = cache.get_or_set(GROUPS_VERSION_KEY, time.time_ns, None)
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version or now >= self._expires:
+                self._groups = {
+                    group.slug: group for group in Group.objects.all()
+                }
+                self._version = version
+                self._expires = now + GROUP_MAP_TTL
+            group = self._groups.get(slug)
+        if group is None:
+            group = Group.objects.filter(slug=slug).first()
+            if group is not None:
+                with self._lock:
+                    self._groups[slug] = group
+        return group
+
+
+group_map = GroupMap()
+
+
+def get_group_or_404(slug):
+    group = group_map.get(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
+
+
+def bump_groups():
+    cache.set(GROUPS_VERSION_KEY, time.time_ns(), None)
+    invalidate_group_directory()
+
+
+def group_stats(groups):
+    return (
+        groups.annotate(
+            posts_count=Count('posts'),
+            authors_count=Count('posts__author', distinct=True),
+            last_post=Max('posts__pub_date'),
+        ).order_by('title')
+        .values(
+            'id', 'title', 'slug', 'description', 'posts_count',
+            'authors_count', 'last_post'
+        )
+    )
+
+
+def group_directory():
+    """Группы со счётчиками постов и авторов и датой последнего поста."""
+    directory = cache.get(GROUP_DIRECTORY_KEY)
+    if directory is None:
+        directory = list(group_stats(Group.objects.all()))
+        cache.set(GROUP_DIRECTORY_KEY, directory, SUMMARY_TIMEOUT)
+    return directory
+
+
+def group_posts_count_key(group_id):
+    return f'posts:group_posts_count:{group_id}'
+
+
+def group_posts_count(group_id):
+    """Число постов группы: один COUNT по индексу group_id на промах."""
+    key = group_posts_count_key(group_id)
+    count = cache.get(key)
+    if count is None:
+        count = Post.objects.filter(group_id=group_id).count()
+        cache.set(key, count, SUMMARY_TIMEOUT)
+    return count
+
+
+def post_group_ids(post):
+    """Группа поста и группа, в которой он был при загрузке из базы."""
+    group_ids = {post.group_id, getattr(post, 'loaded_group_id', None)}
+    group_ids.discard(None)
+    return group_ids
+
+
+def refresh_group_stats(group_ids):
+    """Пересчитывает в каталоге только строки затронутых групп."""
+    if not group_ids:
+        return
+    cache.delete_many([group_posts_count_key(pk) for pk in group_ids])
+    directory = cache.get(GROUP_DIRECTORY_KEY)
+    if directory is None:
+        return
+    fresh = {
+        group['id']: group
+        for group in group_stats(Group.objects.filter(pk__in=group_ids))
+    }
+    directory = [fresh.get(group['id'], group) for group in directory]
+    cache.set(GROUP_DIRECTORY_KEY, directory, SUMMARY_TIMEOUT)
+
+
+def invalidate_group_directory():
+    cache.delete(GROUP_DIRECTORY_KEY)
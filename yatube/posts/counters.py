@@ -0,0 +1,12 @@
+from core.counters import WriteBehindCounter
+
+from .models import Post
+
+post_views = WriteBehindCounter(Post, 'views')
+
+
+def most_viewed_posts(limit=10):
+    return (
+        Post.objects.select_related('author', 'group')
+        .order_by('-views', '-pub_date')[:limit]
+    )
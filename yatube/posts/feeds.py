@@ -0,0 +1,173 @@
+import time
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from .caches import author_summary, get_group_or_404, post_group_ids
+from .models import Group, Post, User
+
+FEED_SIZE = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+
+
+def feed_version_key(scope):
+    return f'posts:feed_version:{scope}'
+
+
+def feed_version(scope):
+    """Версия ленты меняется только при изменении её постов."""
+    return cache.get_or_set(feed_version_key(scope), time.time_ns, None)
+
+
+def bump_feed_versions(post):
+    """Сбрасывает ленты поста, включая группу, из которой его убрали."""
+    scopes = ['index', f'profile:{post.author.username}']
+    group_ids = post_group_ids(post)
+    if group_ids:
+        scopes.extend(
+            f'group:{slug}' for slug in Group.objects.filter(
+                pk__in=group_ids
+            ).values_list('slug', flat=True)
+        )
+    now = time.time_ns()
+    cache.set_many({feed_version_key(scope): now for scope in scopes}, None)
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние обновления на сайте'
+    description = 'Новые посты всех авторов'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def get_posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return (
+            self.get_posts(obj)
+            .select_related('author', 'group')
+            .order_by('-pub_date', '-id')[:FEED_SIZE]
+        )
+
+    def item_title(self, item):
+        return item.text[:50]
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: записи сообщества {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: посты пользователя {obj.username}'
+
+    def description(self, obj):
+        return f'Все посты пользователя {obj.get_full_name()}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+def index_scope(kwargs):
+    return 'index'
+
+
+def group_scope(kwargs):
+    return f'group:{get_group_or_404(kwargs["slug"]).slug}'
+
+
+def profile_scope(kwargs):
+    return f'profile:{author_summary(kwargs["username"])["author"].username}'
+
+
+def cached_feed(feed_class, get_scope):
+    """Отдаёт ленту из кэша и отвечает 304 на условные запросы.
+
+    Сериализованная лента кэшируется под текущей версией, поэтому
+    опрос без новых постов не доходит ни до базы, ни до генератора XML.
+    get_scope отвечает 404 на неизвестную группу или автора, чтобы
+    версии не заводились для произвольных адресов.
+    """
+    feed = feed_class()
+
+    def etag(request, **kwargs):
+        return str(feed_version(get_scope(kwargs)))
+
+    @condition(etag_func=etag)
+    def view(request, **kwargs):
+        scope = get_scope(kwargs)
+        # Ссылки в ленте абсолютные: хост и схема берутся из запроса.
+        key = (
+            f'posts:feed:{feed_class.__name__}:{scope}:{feed_version(scope)}'
+            f':{request.scheme}:{request.get_host()}'
+        )
+        response = cache.get(key)
+        if response is None:
+            response = feed(request, **kwargs)
+            cache.set(key, response, FEED_CACHE_TIMEOUT)
+        return response
+
+    return view
+
+
+index_rss = cached_feed(LatestPostsFeed, index_scope)
+index_atom = cached_feed(LatestPostsAtomFeed, index_scope)
+group_rss = cached_feed(GroupPostsFeed, group_scope)
+group_atom = cached_feed(GroupPostsAtomFeed, group_scope)
+profile_rss = cached_feed(AuthorPostsFeed, profile_scope)
+profile_atom = cached_feed(AuthorPostsAtomFeed, profile_scope)
@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .caches import post_group_ids
+from .models import Comment, Post
+
+LIVE_POLL_INTERVAL = 30
+
+
+def live_key(scope):
+    return f'posts:live:{scope}'
+
+
+def post_scopes(post):
+    """Ленты, в которых виден пост: общая, автора и его группы."""
+    scopes = ['index', f'author:{post.author_id}']
+    scopes.extend(f'group:{pk}' for pk in post_group_ids(post))
+    return scopes
+
+
+def comment_scope(post_id):
+    return f'comments:{post_id}'
+
+
+def feed_scopes(group_id=None, author_ids=None):
+    """Области опроса ленты постов и запросы, которыми их досчитать."""
+    if group_id is not None:
+        return {f'group:{group_id}': Post.objects.filter(group_id=group_id)}
+    if author_ids is not None:
+        return {
+            f'author:{pk}': Post.objects.filter(author_id=pk)
+            for pk in author_ids
+        }
+    return {'index': Post.objects.all()}
+
+
+def comment_scopes(post_id):
+    return {comment_scope(post_id): Comment.objects.filter(post_id=post_id)}
+
+
+def remember_latest(scopes, pk):
+    cache.set_many(dict.fromkeys(map(live_key, scopes), pk), None)
+
+
+def track_post(post, created):
+    """Новый пост сдвигает курсоры своих лент, перенос сбрасывает группы.
+
+    Удаление курсоры не трогает: завышенный курсор лишь отправит опрос
+    в базу, а id удалённого поста новым постам не достанется.
+    """
+    if created:
+        remember_latest(post_scopes(post), post.pk)
+        return
+    group_ids = post_group_ids(post)
+    if len(group_ids) > 1:
+        cache.delete_many([live_key(f'group:{pk}') for pk in group_ids])
+
+
+def latest_id(scopes):
+    """Курсор самой новой записи по областям: из кэша, промахи — из базы."""
+    keys = {live_key(scope): queryset for scope, queryset in scopes.items()}
+    latest = cache.get_many(keys)
+    for key, queryset in keys.items():
+        if key not in latest:
+            latest[key] = queryset.aggregate(last_id=Max('pk'))['last_id'] or 0
+            cache.add(key, latest[key], None)
+    return max(latest.values(), default=0)
+
+
+def parse_cursor(request):
+    """Курсор из ?after=; None — клиент ещё не знает, с чего считать."""
+    try:
+        return int(request.GET.get('after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def new_items(queryset, scopes, after):
+    """Сколько записей queryset новее курсора after и курсор самой новой.
+
+    Курсор самой новой записи областей лежит в кэше и обновляется
+    сигналами, так что опрос без новостей в базу не ходит. Без курсора
+    возвращает только текущий курсор: с него клиент начнёт считать.
+    """
+    last_id = latest_id(scopes)
+    if after is None or last_id <= after:
+        return {
+            'count': 0,
+            'last_id': max(last_id, after or 0),
+            'retry': LIVE_POLL_INTERVAL,
+        }
+    # Курсор берём из базы, а не из кэша: сигнал срабатывает до коммита,
+    # и незакоммиченную запись клиент иначе проскочил бы.
+    stats = queryset.filter(pk__gt=after).aggregate(
+        count=Count('pk'), last_id=Max('pk')
+    )
+    return {
+        'count': stats['count'],
+        'last_id': stats['last_id'] or after,
+        'retry': LIVE_POLL_INTERVAL,
+    }
@@ -0,0 +1,74 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from posts.models import Comment, Follow, Group, Post
+
+CHUNK_SIZE = 2000
+
+# Порядок важен: при импорте внешние ключи должны указывать
+# на уже загруженные записи.
+EXPORT_SOURCES = (
+    ('group', Group.objects, ('id', 'title', 'slug', 'description')),
+    ('post', Post.objects, (
+        'id', 'text', 'pub_date', 'author__username', 'group__slug',
+        'image', 'views'
+    )),
+    ('comment', Comment.objects, (
+        'id', 'text', 'created', 'post_id', 'author__username',
+        'parent_id', 'path'
+    )),
+    ('follow', Follow.objects, ('user__username', 'author__username')),
+)
+
+
+class ContentEncoder(DjangoJSONEncoder):
+    """Сохраняет даты с микросекундами, чтобы импорт их не терял."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает группы, посты, комментарии и подписки в NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-o', '--output',
+            help='Файл для выгрузки, по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Сколько строк читать из базы за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        stream = (
+            open(output, 'w', encoding='utf-8') if output else self.stdout
+        )
+        try:
+            total = self.export(stream, options['chunk_size'])
+        finally:
+            if output:
+                stream.close()
+        if output:
+            self.stderr.write(f'Выгружено записей: {total}')
+
+    def export(self, stream, chunk_size):
+        encoder = ContentEncoder(ensure_ascii=False)
+        total = 0
+        for model_name, manager, fields in EXPORT_SOURCES:
+            rows = (
+                manager.order_by('pk').values(*fields)
+                .iterator(chunk_size=chunk_size)
+            )
+            for row in rows:
+                stream.write(
+                    encoder.encode({'model': model_name, **row}) + '\n'
+                )
+                total += 1
+        return total
@@ -0,0 +1,212 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from posts.models import (Comment, Follow, Group, Post,
+                          comment_path_segment)
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+
+
+def restore_dates(model, objs, field_name, rows):
+    """auto_now_add перезаписывает дату при вставке, возвращаем исходную."""
+    for obj, row in zip(objs, rows):
+        setattr(obj, field_name, parse_datetime(row[field_name]))
+    model.objects.bulk_update(objs, [field_name])
+
+
+class ContentImporter:
+    """Пакетная загрузка записей из выгрузки export_content.
+
+    Посты и комментарии получают id со сдвигом относительно исходных,
+    поэтому внешние ключи пересчитываются без словаря соответствий,
+    а память не растёт вместе с размером выгрузки.
+    """
+
+    def __init__(self, post_offset, comment_offset):
+        self.post_offset = post_offset
+        self.comment_offset = comment_offset
+        self.group_ids = dict(Group.objects.values_list('slug', 'id'))
+
+    def flush(self, model_name, rows):
+        with transaction.atomic():
+            getattr(self, f'import_{model_name}')(rows)
+
+    def user_ids(self, usernames):
+        usernames = set(usernames)
+        found = dict(
+            User.objects.filter(username__in=usernames)
+            .values_list('username', 'id')
+        )
+        missing = usernames - found.keys()
+        if missing:
+            new_users = [User(username=name) for name in missing]
+            for user in new_users:
+                user.set_unusable_password()
+            User.objects.bulk_create(new_users)
+            found.update(
+                User.objects.filter(username__in=missing)
+                .values_list('username', 'id')
+            )
+        return found
+
+    def import_group(self, rows):
+        new_groups = [
+            Group(
+                title=row['title'],
+                slug=row['slug'],
+                description=row['description']
+            )
+            for row in rows if row['slug'] not in self.group_ids
+        ]
+        Group.objects.bulk_create(new_groups)
+        self.group_ids.update(
+            Group.objects.filter(slug__in=[row['slug'] for row in rows])
+            .values_list('slug', 'id')
+        )
+
+    def import_post(self, rows):
+        authors = self.user_ids(row['author__username'] for row in rows)
+        posts = [
+            Post(
+                id=row['id'] + self.post_offset,
+                text=row['text'],
+                author_id=authors[row['author__username']],
+                group_id=self.group_ids.get(row['group__slug']),
+                image=row['image'],
+                views=row.get('views', 0),
+            )
+            for row in rows
+        ]
+        Post.objects.bulk_create(posts, ignore_conflicts=True)
+        restore_dates(Post, posts, 'pub_date', rows)
+
+    def import_comment(self, rows):
+        authors = self.user_ids(row['author__username'] for row in rows)
+        comments = [
+            Comment(
+                id=row['id'] + self.comment_offset,
+                text=row['text'],
+                post_id=row['post_id'] + self.post_offset,
+                author_id=authors[row['author__username']],
+                parent_id=self.shift_comment_id(row['parent_id']),
+                path='.'.join(
+                    comment_path_segment(self.shift_comment_id(int(pk)))
+                    for pk in row['path'].split('.') if pk
+                ),
+            )
+            for row in rows
+        ]
+        Comment.objects.bulk_create(comments, ignore_conflicts=True)
+        restore_dates(Comment, comments, 'created', rows)
+
+    def shift_comment_id(self, pk):
+        return None if pk is None else pk + self.comment_offset
+
+    def import_follow(self, rows):
+        users = self.user_ids(
+            name for row in rows
+            for name in (row['user__username'], row['author__username'])
+        )
+        pairs = {
+            (users[row['user__username']], users[row['author__username']])
+            for row in rows
+        }
+        existing = set(
+            Follow.objects.filter(
+                user_id__in={user_id for user_id, _ in pairs},
+                author_id__in={author_id for _, author_id in pairs},
+            ).values_list('user_id', 'author_id')
+        )
+        Follow.objects.bulk_create(
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in pairs - existing
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает выгрузку export_content пакетами. '
+        'Прерванный импорт продолжается с последней контрольной точки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл NDJSON с выгрузкой.')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько записей вставлять одним запросом.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки, по умолчанию <path>.checkpoint.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден.')
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+        state = self.load_checkpoint(checkpoint_path)
+        importer = ContentImporter(
+            state['post_offset'], state['comment_offset']
+        )
+        batch_size = options['batch_size']
+        batch, batch_model = [], None
+        with open(path, encoding='utf-8') as stream:
+            for line_number, line in enumerate(stream, start=1):
+                if line_number <= state['line'] or not line.strip():
+                    continue
+                row = json.loads(line)
+                model_name = row.pop('model')
+                if batch and (
+                    model_name != batch_model or len(batch) >= batch_size
+                ):
+                    importer.flush(batch_model, batch)
+                    self.save_checkpoint(
+                        checkpoint_path, state, line_number - 1
+                    )
+                    batch = []
+                batch_model = model_name
+                batch.append(row)
+            if batch:
+                importer.flush(batch_model, batch)
+        self.reset_sequences()
+        os.remove(checkpoint_path)
+        self.stderr.write('Импорт завершён.')
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [Post, Comment]
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def load_checkpoint(self, checkpoint_path):
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding='utf-8') as checkpoint:
+                return json.load(checkpoint)
+        state = {
+            'line': 0,
+            'post_offset': Post.objects.aggregate(Max('id'))['id__max'] or 0,
+            'comment_offset': (
+                Comment.objects.aggregate(Max('id'))['id__max'] or 0
+            ),
+        }
+        self.save_checkpoint(checkpoint_path, state, 0)
+        return state
+
+    def save_checkpoint(self, checkpoint_path, state, line_number):
+        state['line'] = line_number
+        tmp_path = f'{checkpoint_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as checkpoint:
+            json.dump(state, checkpoint)
+        os.replace(tmp_path, checkpoint_path)
@@ -0,0 +1,83 @@
+import heapq
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Post, PopularPost
+
+RANK_SIZE = 1000
+RANK_WINDOW = timedelta(days=7)
+COMMENT_WEIGHT = 3
+FOLLOWER_WEIGHT = 0.5
+VIEW_WEIGHT = 0.1
+LIKE_WEIGHT = 2
+GRAVITY = 1.5
+
+
+def count_of(queryset, field):
+    """COUNT(*) по queryset, сгруппированному по field, как подзапрос.
+
+    Каждое слагаемое считается отдельно, поэтому комментарии не
+    перемножаются с подписчиками, как при двух JOIN в одном запросе.
+    """
+    counts = (
+        queryset.order_by().values(field)
+        .annotate(total=Count('pk')).values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def post_score(post, now):
+    """Взвешенная активность, затухающая с возрастом поста."""
+    activity = (
+        post.comments_total * COMMENT_WEIGHT
+        + post.followers_total * FOLLOWER_WEIGHT
+        + post.views * VIEW_WEIGHT
+        + post.likes_count * LIKE_WEIGHT
+    )
+    age_hours = (now - post.pub_date).total_seconds() / 3600
+    return (activity + 1) / (age_hours + 2) ** GRAVITY
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинг популярных постов. '
+        'Запускается по расписанию, например из cron раз в несколько минут.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=RANK_SIZE,
+            help='Сколько постов хранить в рейтинге.'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        posts = (
+            Post.objects.filter(pub_date__gte=now - RANK_WINDOW)
+            .annotate(
+                comments_total=count_of(
+                    Comment.objects.filter(post=OuterRef('pk')), 'post'
+                ),
+                followers_total=count_of(
+                    Follow.objects.filter(author=OuterRef('author_id')),
+                    'author'
+                ),
+            )
+            .only('pk', 'pub_date', 'views', 'likes_count')
+            .iterator(chunk_size=2000)
+        )
+        scores = heapq.nlargest(
+            options['size'],
+            ((post_score(post, now), post.pk) for post in posts)
+        )
+        with transaction.atomic():
+            PopularPost.objects.all().delete()
+            PopularPost.objects.bulk_create(
+                PopularPost(post_id=pk, score=score) for score, pk in scores
+            )
+        self.stderr.write(f'В рейтинге постов: {len(scores)}')
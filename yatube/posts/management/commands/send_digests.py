@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Рассылает подписчикам дайджесты новых постов. '
+        'Запускается по расписанию, например из cron раз в час.'
+    )
+
+    def handle(self, *args, **options):
+        sent = send_digests()
+        self.stderr.write(f'Отправлено дайджестов: {sent}')
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_comment_paths(apps, schema_editor):
+    Comment = apps.get_model('posts', 'Comment')
+    comments = Comment.objects.only('pk').iterator(chunk_size=2000)
+    batch = []
+    for comment in comments:
+        comment.path = str(comment.pk).zfill(10)
+        batch.append(comment)
+        if len(batch) >= 2000:
+            Comment.objects.bulk_update(batch, ['path'])
+            batch = []
+    Comment.objects.bulk_update(batch, ['path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_follow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.Comment', verbose_name='Ответ на комментарий'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=220, verbose_name='Путь в ветке'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_comment_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='views',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Просмотры'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_likes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularPost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rank', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('score', models.FloatField(db_index=True, verbose_name='Рейтинг')),
+            ],
+            options={
+                'verbose_name': 'Популярный пост',
+                'verbose_name_plural': 'Популярные посты',
+                'ordering': ('-score',),
+            },
+        ),
+    ]
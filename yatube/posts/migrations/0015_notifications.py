@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0014_popular_post'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadNotifications',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_notifications', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Непрочитанных')),
+            ],
+            options={
+                'verbose_name': 'Счётчик уведомлений',
+                'verbose_name_plural': 'Счётчики уведомлений',
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('sent', models.BooleanField(default=False, verbose_name='Отправлено в дайджесте')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+            options={
+                'verbose_name': 'Уведомление',
+                'verbose_name_plural': 'Уведомления',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['sent', 'user'], name='posts_notif_sent_bbb251_idx'),
+        ),
+    ]
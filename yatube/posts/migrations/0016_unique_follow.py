@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:37
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    duplicates = (
+        Follow.objects.values('user', 'author')
+        .annotate(first_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        Follow.objects.filter(
+            user=duplicate['user'], author=duplicate['author']
+        ).exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_notifications'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_follows, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_unique_follow'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_notification'),
+        ),
+    ]
@@ -5,6 +5,9 @@ from core.models import CreatedModel
 
 User = get_user_model()
 
+COMMENT_PATH_STEP = 10
+COMMENT_MAX_DEPTH = 20
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -56,6 +59,17 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    views = models.PositiveIntegerField(
+        'Просмотры',
+        default=0,
+        db_index=True,
+        editable=False
+    )
+    likes_count = models.PositiveIntegerField(
+        'Лайки',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         ordering = ('-pub_date',)
@@ -65,6 +79,33 @@ class Post(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Группа на момент загрузки: при переносе поста сбрасываются обе.
+        post.loaded_group_id = post.__dict__.get('group_id')
+        return post
+
+
+def comment_path_segment(pk):
+    return str(pk).zfill(COMMENT_PATH_STEP)
+
+
+class CommentQuerySet(models.QuerySet):
+    def replies_to(self, roots):
+        """Все ответы в ветках roots одним запросом по индексу path.
+
+        Ветка — это диапазон путей между «<корень>.» и «<корень>/»,
+        отсортированный по path, т.е. в порядке обхода дерева.
+        """
+        condition = models.Q()
+        for root in roots:
+            prefix = root.get_path()
+            condition |= models.Q(path__gt=f'{prefix}.', path__lt=f'{prefix}/')
+        if not condition:
+            return self.none()
+        return self.filter(condition).order_by('path')
+
 
 class Comment(CreatedModel):
     text = models.TextField(
@@ -83,10 +124,47 @@ class Comment(CreatedModel):
         related_name='comments',
         verbose_name='Автор'
     )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        related_name='replies',
+        blank=True,
+        null=True,
+        verbose_name='Ответ на комментарий'
+    )
+    path = models.CharField(
+        'Путь в ветке',
+        max_length=COMMENT_MAX_DEPTH * (COMMENT_PATH_STEP + 1),
+        db_index=True,
+        editable=False
+    )
+
+    objects = CommentQuerySet.as_manager()
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def depth(self):
+        return self.get_path().count('.')
+
+    def get_path(self):
+        return self.path or comment_path_segment(self.pk)
+
+    def save(self, *args, **kwargs):
+        if self.parent is not None and (
+            self.parent.depth >= COMMENT_MAX_DEPTH - 1
+        ):
+            self.parent = self.parent.parent
+        super().save(*args, **kwargs)
+        if not self.path:
+            segment = comment_path_segment(self.pk)
+            self.path = (
+                f'{self.parent.get_path()}.{segment}'
+                if self.parent is not None else segment
+            )
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
     class Meta:
         ordering = ('-created',)
         verbose_name = 'Комментарий'
@@ -107,5 +185,108 @@ class Follow(models.Model):
         verbose_name='Автор'
     )
 
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'
+            ),
+        )
+
     def __str__(self):
         return f'{self.user} подписан на автора {self.author.get_full_name()}'
+
+
+class Like(CreatedModel):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пост'
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='unique_like'
+            ),
+        )
+        verbose_name = 'Лайк'
+        verbose_name_plural = 'Лайки'
+
+    def __str__(self):
+        return f'{self.user} лайкнул пост {self.post_id}'
+
+
+class PopularPost(models.Model):
+    """Предрасчитанный рейтинг популярных постов, см. команду rank_posts."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rank',
+        verbose_name='Пост'
+    )
+    score = models.FloatField('Рейтинг', db_index=True)
+
+    class Meta:
+        ordering = ('-score',)
+        verbose_name = 'Популярный пост'
+        verbose_name_plural = 'Популярные посты'
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score:.3f}'
+
+
+class Notification(CreatedModel):
+    """Новый пост автора, на которого подписан пользователь."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Подписчик'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Пост'
+    )
+    sent = models.BooleanField('Отправлено в дайджесте', default=False)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='unique_notification'
+            ),
+        )
+        indexes = (models.Index(fields=('sent', 'user')),)
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+
+    def __str__(self):
+        return f'{self.user}: пост {self.post_id}'
+
+
+class UnreadNotifications(models.Model):
+    """Счётчик непрочитанных, чтобы не считать их на каждой странице."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='unread_notifications',
+        verbose_name='Пользователь'
+    )
+    count = models.PositiveIntegerField('Непрочитанных', default=0)
+
+    class Meta:
+        verbose_name = 'Счётчик уведомлений'
+        verbose_name_plural = 'Счётчики уведомлений'
+
+    def __str__(self):
+        return f'{self.user}: {self.count}'
@@ -0,0 +1,123 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+
+from .models import Follow, Notification, Post, UnreadNotifications, User
+
+FAN_OUT_BATCH = 1000
+DIGEST_BATCH = 100
+
+
+def fan_out(post_id):
+    """Раскладывает новый пост по подписчикам пакетами по FAN_OUT_BATCH."""
+    post = Post.objects.filter(pk=post_id).only('pk', 'author_id').first()
+    if post is None:
+        return
+    follower_ids = (
+        Follow.objects.filter(author_id=post.author_id)
+        .values_list('user_id', flat=True)
+        .iterator(chunk_size=FAN_OUT_BATCH)
+    )
+    batch = []
+    for user_id in follower_ids:
+        batch.append(user_id)
+        if len(batch) >= FAN_OUT_BATCH:
+            notify_batch(post, batch)
+            batch = []
+    if batch:
+        notify_batch(post, batch)
+
+
+def notify_batch(post, user_ids):
+    """Уведомляет пакет подписчиков; повтор задачи ничего не удваивает.
+
+    Счётчики растут только у тех, кому уведомление вставлено сейчас,
+    а unique (user, post) отбрасывает дубли от параллельного запуска.
+    """
+    with transaction.atomic():
+        notified = set(
+            Notification.objects.filter(post=post, user_id__in=user_ids)
+            .values_list('user_id', flat=True)
+        )
+        new_ids = [
+            user_id for user_id in user_ids if user_id not in notified
+        ]
+        if not new_ids:
+            return
+        Notification.objects.bulk_create(
+            (Notification(user_id=user_id, post=post) for user_id in new_ids),
+            ignore_conflicts=True
+        )
+        UnreadNotifications.objects.bulk_create(
+            (UnreadNotifications(user_id=user_id) for user_id in new_ids),
+            ignore_conflicts=True
+        )
+        UnreadNotifications.objects.filter(user_id__in=new_ids).update(
+            count=F('count') + 1
+        )
+
+
+def unread_count(user):
+    return (
+        UnreadNotifications.objects.filter(user=user)
+        .values_list('count', flat=True).first() or 0
+    )
+
+
+def mark_read(user):
+    """Обнуляет счётчик; без непрочитанных обходится без записи."""
+    if unread_count(user):
+        UnreadNotifications.objects.filter(user=user).update(count=0)
+
+
+def send_digests():
+    """Отправляет дайджесты через одно соединение с почтовым бэкендом."""
+    sent_total = 0
+    with get_connection() as connection:
+        while True:
+            user_ids = list(
+                Notification.objects.filter(sent=False)
+                .values_list('user_id', flat=True)
+                .distinct()[:DIGEST_BATCH]
+            )
+            if not user_ids:
+                return sent_total
+            notifications = (
+                Notification.objects.filter(sent=False, user_id__in=user_ids)
+                .select_related('post__author')
+                .order_by('user_id', 'created')
+            )
+            posts_by_user = {}
+            notification_ids = []
+            for notification in notifications:
+                posts_by_user.setdefault(notification.user_id, []).append(
+                    notification.post
+                )
+                notification_ids.append(notification.pk)
+            users = User.objects.in_bulk(posts_by_user)
+            messages = [
+                digest_message(users[user_id], posts, connection)
+                for user_id, posts in posts_by_user.items()
+                if users[user_id].email
+            ]
+            connection.send_messages(messages)
+            Notification.objects.filter(pk__in=notification_ids).update(
+                sent=True
+            )
+            sent_total += len(messages)
+
+
+def digest_message(user, posts, connection):
+    body = render_to_string(
+        'posts/email/digest.txt',
+        {'user': user, 'posts': posts, 'site_url': settings.SITE_URL},
+    )
+    return EmailMessage(
+        subject=f'Yatube: новых постов — {len(posts)}',
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+        connection=connection,
+    )
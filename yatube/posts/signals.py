@@ -0,0 +1,81 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caches import (bump_following, bump_groups, invalidate_author_summary,
+                     post_group_ids, refresh_group_stats)
+from .feeds import bump_feed_versions
+from .live import comment_scope, remember_latest, track_post
+from .models import Comment, Follow, Group, Post, User
+from .tasks import fan_out_post
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, created=False, **kwargs):
+    bump_feed_versions(instance)
+    invalidate_author_summary(instance.author.username)
+    refresh_group_stats(post_group_ids(instance))
+    track_post(instance, created)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        fan_out_post.delay(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        remember_latest([comment_scope(instance.post_id)], instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    """Сбрасывает подписки и шапку автора, не загружая автора целиком."""
+    bump_following(instance.user_id)
+    author = Follow.author.field.get_cached_value(instance, None)
+    username = author.username if author is not None else (
+        User.objects.filter(pk=instance.author_id)
+        .values_list('username', flat=True).first()
+    )
+    if username:
+        invalidate_author_summary(username)
+
+
+# Поля пользователя, которые показывает шапка профиля.
+SUMMARY_FIELDS = frozenset(('username', 'first_name', 'last_name'))
+
+
+def summary_changed(update_fields):
+    return update_fields is None or not SUMMARY_FIELDS.isdisjoint(
+        update_fields
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or not summary_changed(update_fields):
+        return
+    instance.previous_username = (
+        User.objects.filter(pk=instance.pk)
+        .values_list('username', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    """Сбрасывает шапку профиля, кроме записей вроде last_login."""
+    if not summary_changed(update_fields):
+        return
+    invalidate_author_summary(instance.username)
+    previous = getattr(instance, 'previous_username', None)
+    if previous and previous != instance.username:
+        invalidate_author_summary(previous)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    bump_groups()
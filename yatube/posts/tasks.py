@@ -0,0 +1,23 @@
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+
+from . import notifications
+from .models import Post
+
+THUMBNAIL_SIZES = ('200x200', '300x300')
+
+
+@task
+def warm_thumbnails(post_id):
+    """Готовит миниатюры заранее, чтобы их не резала первая отрисовка."""
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    for size in THUMBNAIL_SIZES:
+        get_thumbnail(post.image, size, crop='center', upscale=True)
+
+
+@task
+def fan_out_post(post_id):
+    notifications.fan_out(post_id)
@@ -0,0 +1,66 @@
+from django import template
+from django.conf import settings
+from django.template import engines
+from django.utils.safestring import mark_safe
+
+from core.reverse import cached_reverse
+from posts.counters import post_views
+
+register = template.Library()
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+def build_cards(posts):
+    return [
+        {
+            'post': post,
+            'views': post.views + post_views.pending(post.pk),
+            'profile_url': cached_reverse(
+                'posts:profile', post.author.username
+            ),
+            'follow_url': cached_reverse(
+                'posts:profile_follow', post.author.username
+            ),
+            'detail_url': cached_reverse('posts:post_detail', post.pk),
+            'like_url': cached_reverse('posts:post_like', post.pk),
+            'unlike_url': cached_reverse('posts:post_unlike', post.pk),
+            'group_url': (
+                cached_reverse('posts:group_list', post.group.slug)
+                if post.group else ''
+            ),
+        }
+        for post in posts
+    ]
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """{% post_cards page_obj as cards %}: HTML всех карточек страницы.
+
+    Шаблон карточки загружается один раз, все карточки рендерятся в одном
+    контексте, адреса собраны заранее. При POSTS_JINJA2 — через Jinja2.
+    """
+    user = context['user']
+    request = context.get('request')
+    next_url = request.get_full_path() if request else ''
+    cards = build_cards(posts)
+    if settings.POSTS_JINJA2:
+        card = engines['jinja2'].get_template(CARD_TEMPLATE)
+        return [
+            mark_safe(card.render(
+                dict(values, user=user, next_url=next_url), request
+            ))
+            for values in cards
+        ]
+    card = context.template.engine.get_template(CARD_TEMPLATE)
+    card_context = context.new({
+        'user': user,
+        'csrf_token': context.get('csrf_token'),
+        'next_url': next_url,
+    })
+    rendered = []
+    for values in cards:
+        with card_context.push(values):
+            rendered.append(card.render(card_context))
+    return rendered
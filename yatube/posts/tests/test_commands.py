@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, PopularPost, Post, User
+
+
+class ContentCommandsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_group',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый текст',
+            group=cls.group,
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'content.ndjson')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def export(self):
+        call_command('export_content', output=self.path, stderr=StringIO())
+        with open(self.path, encoding='utf-8') as stream:
+            return [json.loads(line) for line in stream]
+
+    def test_export_writes_one_line_per_record(self):
+        """Выгрузка содержит по строке на каждую запись."""
+        rows = self.export()
+        self.assertEqual(
+            [row['model'] for row in rows],
+            ['group', 'post', 'comment', 'follow']
+        )
+        self.assertEqual(rows[1]['author__username'], 'Author')
+
+    def test_import_remaps_foreign_keys(self):
+        """Импорт создаёт копии постов и переносит связи на них."""
+        self.export()
+        call_command('import_content', self.path, stderr=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        copy = Post.objects.exclude(pk=self.post.pk).get()
+        self.assertEqual(copy.pub_date, self.post.pub_date)
+        self.assertEqual(copy.group, self.group)
+        self.assertEqual(copy.comments.get().author, self.reader)
+        self.assertFalse(os.path.exists(f'{self.path}.checkpoint'))
+
+    def test_import_resumes_from_checkpoint(self):
+        """Импорт пропускает строки до контрольной точки."""
+        self.export()
+        with open(f'{self.path}.checkpoint', 'w') as checkpoint:
+            json.dump(
+                {'line': 2, 'post_offset': 0, 'comment_offset': 100},
+                checkpoint
+            )
+        call_command('import_content', self.path, stderr=StringIO())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(self.post.comments.count(), 2)
+
+
+class RankPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.quiet_post = Post.objects.create(author=cls.author, text='Тихий')
+        cls.hot_post = Post.objects.create(author=cls.author, text='Горячий')
+        Comment.objects.create(
+            post=cls.hot_post, author=cls.author, text='Комментарий'
+        )
+
+    def test_rank_posts_orders_by_activity(self):
+        """Рейтинг ставит обсуждаемый пост выше."""
+        call_command('rank_posts', stderr=StringIO())
+        self.assertEqual(
+            list(PopularPost.objects.values_list('post_id', flat=True)),
+            [self.hot_post.pk, self.quiet_post.pk]
+        )
+
+    def test_rank_posts_counts_without_joins(self):
+        """Комментарии и подписчики считаются подзапросами, без JOIN."""
+        with CaptureQueriesContext(connection) as queries:
+            call_command('rank_posts', stderr=StringIO())
+        select = next(
+            query['sql'] for query in queries.captured_queries
+            if 'posts_post' in query['sql'] and 'SELECT' in query['sql']
+        )
+        self.assertNotIn('JOIN', select)
+
+    def test_popular_page_reads_ranking(self):
+        """Страница популярного показывает посты из рейтинга по курсору."""
+        call_command('rank_posts', size=1, stderr=StringIO())
+        response = self.client.get(reverse('posts:popular'))
+        self.assertEqual(
+            list(response.context['page_obj']), [self.hot_post]
+        )
+        self.assertFalse(response.context['page_obj'].has_next)
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class FeedsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Shakespeare')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_group',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_contain_post(self):
+        """Ленты RSS и Atom содержат пост."""
+        urls = [
+            reverse('posts:index_rss'),
+            reverse('posts:index_atom'),
+            reverse('posts:group_rss', args=[self.group.slug]),
+            reverse('posts:group_atom', args=[self.group.slug]),
+            reverse('posts:profile_rss', args=[self.user.username]),
+            reverse('posts:profile_atom', args=[self.user.username]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, self.post.text)
+
+    def test_unknown_group_feed_not_found(self):
+        """Лента несуществующей группы отвечает 404."""
+        response = self.guest_client.get(
+            reverse('posts:group_rss', args=['unknown'])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_feed_conditional_get(self):
+        """Лента без новых постов отвечает 304 по ETag."""
+        url = reverse('posts:index_rss')
+        etag = self.guest_client.get(url)['ETag']
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Новый пост')
+
+    def test_feed_version_is_scoped(self):
+        """Новый пост без группы не меняет ленту группы."""
+        url = reverse('posts:group_rss', args=[self.group.slug])
+        etag = self.guest_client.get(url)['ETag']
+        Post.objects.create(author=self.user, text='Пост без группы')
+        self.assertEqual(self.guest_client.get(url)['ETag'], etag)
+
+    def test_moved_post_refreshes_old_group(self):
+        """Перенос поста в другую группу сбрасывает ленту прежней."""
+        url = reverse('posts:group_rss', args=[self.group.slug])
+        self.assertContains(self.guest_client.get(url), self.post.text)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = None
+        post.save()
+        self.assertNotContains(self.guest_client.get(url), self.post.text)
+
+    def test_unknown_scope_has_no_version(self):
+        """Запрос ленты неизвестного автора не заводит версию в кэше."""
+        response = self.guest_client.get(
+            reverse('posts:profile_rss', args=['nobody'])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertIsNone(cache.get('posts:feed_version:profile:nobody'))
+
+    def test_cached_feed_keeps_request_host(self):
+        """Кэш ленты не отдаёт ссылки с хостом и схемой другого запроса."""
+        url = reverse('posts:index_rss')
+        self.guest_client.get(url, HTTP_HOST='127.0.0.1')
+        response = self.guest_client.get(
+            url, HTTP_HOST='localhost', secure=True
+        )
+        self.assertContains(response, 'https://localhost/')
+        self.assertNotContains(response, '127.0.0.1')
@@ -176,3 +176,22 @@ class PostCreateFormTests(TestCase):
             ).exists()
         )
         self.assertEqual(Comment.objects.count(), comment_count)
+
+    def test_comment_form_reply(self):
+        """Ответ на комментарий попадает в его ветку."""
+        response = self.authorized_client.post(
+            reverse(
+                'posts:add_comment',
+                kwargs={'post_id': f'{self.post.id}'}
+            ),
+            data={'text': 'Ответ', 'parent': self.comment.id},
+        )
+        self.assertRedirects(
+            response, reverse(
+                'posts:post_detail',
+                kwargs={'post_id': f'{self.post.id}'}
+            )
+        )
+        reply = Comment.objects.get(text='Ответ')
+        self.assertEqual(reply.parent, self.comment)
+        self.assertTrue(reply.path.startswith(f'{self.comment.path}.'))
@@ -0,0 +1,117 @@
+import os
+import re
+import shutil
+import tempfile
+from unittest import skipUnless
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import engines
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Group, Post, User
+
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+JINJA2_TEMPLATES = settings.TEMPLATES + [{
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'DIRS': [os.path.join(settings.BASE_DIR, 'jinja2')],
+    'OPTIONS': {'environment': 'core.jinja2.environment'},
+}]
+
+
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="[^"]*"')
+
+
+def normalize(html):
+    # Маскированный CSRF-токен различается от запроса к запросу.
+    html = CSRF_INPUT.sub('name="csrfmiddlewaretoken"', html)
+    return ' '.join(html.split())
+
+
+@skipUnless(jinja2, 'Jinja2 не установлен')
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TEMPLATES=JINJA2_TEMPLATES)
+class Jinja2ParityTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test_group', description='Текст'
+        )
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x01\x00'
+            b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+            b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+            b'\x00\x00\x01\x00\x01\x00\x00\x02'
+            b'\x02\x4c\x01\x00\x3b'
+        )
+        Post.objects.create(
+            author=cls.user,
+            text='С картинкой <b>и разметкой</b>',
+            group=cls.group,
+            image=SimpleUploadedFile(
+                name='small.gif', content=small_gif, content_type='image/gif'
+            ),
+        )
+        Post.objects.create(author=cls.user, text='Без группы')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def render_both(self, client, url):
+        pages = []
+        for use_jinja2 in (False, True):
+            cache.clear()
+            with self.settings(POSTS_JINJA2=use_jinja2):
+                pages.append(normalize(client.get(url).content.decode()))
+        return pages
+
+    def test_feed_pages_match_django(self):
+        """Карточки Jinja2 дают тот же HTML, что и шаблоны Django."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        for client in (Client(), self.reader_client):
+            for url in urls:
+                with self.subTest(url=url):
+                    django_html, jinja2_html = self.render_both(client, url)
+                    self.assertIn('<article>', django_html)
+                    self.assertEqual(jinja2_html, django_html)
+
+    def test_addclass_and_cache_match_django(self):
+        """addclass и cache в Jinja2 совпадают с тегами Django."""
+
+        class NameForm(forms.Form):
+            name = forms.CharField()
+
+        context = {'form': NameForm(), 'value': 'первый'}
+        django_html = engines['django'].from_string(
+            '{% load user_filters cache %}{{ form.name|addclass:"wide" }}'
+            '{% cache 60 fragment 1 %}{{ value }}{% endcache %}'
+        ).render(context)
+        context['value'] = 'второй'
+        jinja2_html = engines['jinja2'].from_string(
+            '{{ form.name|addclass("wide") }}'
+            '{% call cache(60, "fragment", 1) %}{{ value }}{% endcall %}'
+        ).render(context)
+        self.assertEqual(jinja2_html, django_html)
+        self.assertIn('первый', jinja2_html)
@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class LiveViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_group',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def poll(self, url, after=None, **params):
+        if after is not None:
+            params['after'] = after
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.json()
+
+    def test_first_poll_returns_cursor(self):
+        """Первый опрос отдаёт курсор и ничего не считает новым."""
+        data = self.poll(reverse('posts:live_posts'))
+        self.assertEqual(data['count'], 0)
+        self.assertEqual(data['last_id'], self.post.pk)
+
+    def test_new_posts_counted_per_feed(self):
+        """Новые посты считаются с курсора и только в своей ленте."""
+        url = reverse('posts:live_posts')
+        after = self.poll(url)['last_id']
+        Post.objects.create(
+            author=self.user, text='В группе', group=self.group
+        )
+        Post.objects.create(author=self.reader, text='Свой пост')
+        cases = (
+            ({}, 2),
+            ({'group': self.group.slug}, 1),
+            ({'follow': 1}, 1),
+        )
+        for params, count in cases:
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.poll(url, after, **params)['count'], count
+                )
+
+    def test_new_comments_counted(self):
+        """Новые комментарии считаются с курсора страницы поста."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        after = response.context['live_after']
+        Comment.objects.create(post=self.post, author=self.user, text='Ок')
+        url = reverse('posts:live_comments', args=[self.post.pk])
+        self.assertEqual(self.poll(url, after)['count'], 1)
+
+    def test_page_renders_cursor(self):
+        """Страница сразу отдаёт курсор, первый опрос его не ищет."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['live_after'], self.post.pk)
+        self.assertContains(response, f'data-after="{self.post.pk}"')
+
+    def test_poll_without_news_skips_database(self):
+        """Опрос без новых записей читает курсор из кэша."""
+        url = reverse('posts:live_posts')
+        after = self.poll(url)['last_id']
+        cases = (
+            {},
+            {'group': self.group.slug},
+            {'follow': 1},
+        )
+        for params in cases:
+            with self.subTest(params=params):
+                self.poll(url, after, **params)
+                with CaptureQueriesContext(connection) as queries:
+                    self.assertEqual(
+                        self.poll(url, after, **params)['count'], 0
+                    )
+                self.assertFalse([
+                    query for query in queries
+                    if 'posts_post' in query['sql']
+                ])
+
+    def test_live_unknown_group_not_found(self):
+        """Опрос несуществующей группы отвечает 404."""
+        response = self.client.get(
+            reverse('posts:live_posts') + '?group=nope'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
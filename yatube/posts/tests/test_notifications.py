@@ -0,0 +1,69 @@
+from django.core import mail
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Notification, Post, User
+from posts.notifications import fan_out, send_digests, unread_count
+
+
+class NotificationsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.follower = User.objects.create_user(
+            username='Follower', email='follower@example.com'
+        )
+        cls.stranger = User.objects.create_user(username='Stranger')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+
+    def setUp(self):
+        self.post = Post.objects.create(author=self.author, text='Новый пост')
+        fan_out(self.post.pk)
+
+    def test_fan_out_notifies_followers_only(self):
+        """Уведомления получают только подписчики автора."""
+        self.assertEqual(
+            list(Notification.objects.values_list('user', flat=True)),
+            [self.follower.pk]
+        )
+        self.assertEqual(unread_count(self.follower), 1)
+        self.assertEqual(unread_count(self.stranger), 0)
+
+    def test_fan_out_retry_is_idempotent(self):
+        """Повтор задачи не дублирует уведомления и счётчик."""
+        fan_out(self.post.pk)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(unread_count(self.follower), 1)
+
+    def test_follow_index_marks_read(self):
+        """Визит в ленту подписок обнуляет счётчик непрочитанных."""
+        client = Client()
+        client.force_login(self.follower)
+        response = client.get(reverse('posts:index'))
+        self.assertContains(response, 'Подписки (1)')
+        client.get(reverse('posts:follow_index'))
+        self.assertEqual(unread_count(self.follower), 0)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(reverse('posts:follow_index'))
+        self.assertFalse(any(
+            query['sql'].startswith('UPDATE "posts_unreadnotifications"')
+            for query in queries.captured_queries
+        ))
+
+    def test_send_digests(self):
+        """Дайджест уходит одним письмом и больше не повторяется."""
+        fan_out(Post.objects.create(author=self.author, text='Ещё пост').pk)
+        self.assertEqual(send_digests(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.follower.email])
+        self.assertIn('Ещё пост', mail.outbox[0].body)
+        self.assertIn(
+            'http://localhost' + reverse('posts:post_detail', args=[
+                self.post.pk
+            ]),
+            mail.outbox[0].body
+        )
+        self.assertEqual(send_digests(), 0)
@@ -0,0 +1,36 @@
+from django.contrib.auth.models import AnonymousUser
+from django.template import Context, Template
+from django.test import TestCase
+from django.urls import reverse
+from posts.models import Group, Post, User
+
+
+class PostCardsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Автор_1')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Текст', group=cls.group
+        )
+
+    def test_post_cards_render_every_post(self):
+        """Тег отдаёт по карточке на пост с готовыми адресами."""
+        template = Template(
+            '{% load posts_tags %}{% post_cards posts as cards %}'
+            '{% for card in cards %}{{ card }}{% endfor %}'
+        )
+        html = template.render(Context({
+            'posts': [self.post], 'user': AnonymousUser(),
+        }))
+        for viewname, value in (
+            ('posts:profile', self.user.username),
+            ('posts:post_detail', self.post.pk),
+            ('posts:group_list', self.group.slug),
+        ):
+            with self.subTest(viewname=viewname):
+                self.assertIn(reverse(viewname, args=(value,)), html)
+        self.assertEqual(html.count('<article>'), 1)
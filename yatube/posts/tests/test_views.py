@@ -1,5 +1,7 @@
+import re
 import shutil
 import tempfile
+from http import HTTPStatus
 
 from django import forms
 from django.conf import settings
@@ -7,7 +9,10 @@ from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
-from posts.models import Follow, Group, Post, User
+from posts.caches import (author_summary_key, followed_author_ids,
+                          unfollow_author)
+from posts.live import feed_scopes, latest_id
+from posts.models import Comment, Follow, Group, Like, Post, User
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -106,14 +111,14 @@ class PostPagesTests(TestCase):
             text='Тестовый текст',
             group=self.group,
         )
-        response = self.authorized_client.get(reverse('posts:index')).content
+        response = self.guest_client.get(reverse('posts:index')).content
         post_cached.delete()
-        response_cached = self.authorized_client.get(
+        response_cached = self.guest_client.get(
             reverse('posts:index')
         ).content
         self.assertEqual(response, response_cached)
         cache.clear()
-        response_non_cached = self.authorized_client.get(
+        response_non_cached = self.guest_client.get(
             reverse('posts:index')
         ).content
         self.assertNotEqual(response, response_non_cached)
@@ -317,6 +322,32 @@ class PaginatorViewsTest(TestCase):
         self.assertEqual(len(response.context['page_obj']), 3)
 
 
+class IndexQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for number in range(10):
+            Post.objects.create(
+                author=User.objects.create_user(username=f'author{number}'),
+                group=Group.objects.create(
+                    title=f'Группа {number}',
+                    slug=f'group_{number}',
+                    description='Описание',
+                ),
+                text='Тестовый текст',
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_index_cards_do_not_query_per_post(self):
+        """Главная читает авторов и группы вместе с постами."""
+        latest_id(feed_scopes())
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 10)
+
+
 class FollowViewsTest(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -329,6 +360,7 @@ class FollowViewsTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.follower = Client()
         self.follower.force_login(self.user)
         self.author_client = Client()
@@ -377,3 +409,305 @@ class FollowViewsTest(TestCase):
         self.assertTrue(
             self.post in response.context['page_obj'].object_list
         )
+
+
+class CommentsPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Shakespeare')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый текст')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(25)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_post_detail_shows_first_comments_page(self):
+        """На странице поста выводится только первая страница комментариев."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), 20)
+        self.assertTrue(comments.has_next)
+
+    def test_comments_fragment_continues_from_cursor(self):
+        """Фрагмент по курсору отдаёт оставшиеся комментарии."""
+        first_page = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        ).context['comments']
+        response = self.guest_client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.id}),
+            {'cursor': first_page.next_cursor}
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), 5)
+        self.assertFalse(comments.has_next)
+        self.assertFalse(
+            set(first_page.object_list) & set(comments.object_list)
+        )
+
+    def test_post_detail_shows_threads(self):
+        """Ответы выводятся сразу после своего корневого комментария."""
+        root = Comment.objects.create(
+            post=self.post, author=self.user, text='Корень'
+        )
+        reply = Comment.objects.create(
+            post=self.post, author=self.user, text='Ответ', parent=root
+        )
+        nested = Comment.objects.create(
+            post=self.post, author=self.user, text='Ответ', parent=reply
+        )
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        comments = list(response.context['comments'])
+        self.assertEqual(comments[:3], [root, reply, nested])
+        self.assertEqual([c.depth for c in comments[:3]], [0, 1, 2])
+
+
+class LikeViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='User')
+        cls.author = User.objects.create_user(username='Author')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_like_is_idempotent(self):
+        """Повторный лайк и повторная отмена не меняют счётчик."""
+        like_url = reverse('posts:post_like', kwargs={'post_id': self.post.id})
+        unlike_url = reverse(
+            'posts:post_unlike', kwargs={'post_id': self.post.id}
+        )
+        expected = [(like_url, 1), (like_url, 1), (unlike_url, 0),
+                    (unlike_url, 0)]
+        for url, likes_count in expected:
+            with self.subTest(url=url, likes_count=likes_count):
+                response = self.client.post(url)
+                self.assertRedirects(response, reverse(
+                    'posts:post_detail', kwargs={'post_id': self.post.id}
+                ))
+                self.post.refresh_from_db()
+                self.assertEqual(self.post.likes_count, likes_count)
+                self.assertEqual(self.post.likes.count(), likes_count)
+
+    def test_like_requires_post(self):
+        """GET-запрос не ставит лайк: ссылка с чужого сайта не сработает."""
+        response = self.client.get(
+            reverse('posts:post_like', kwargs={'post_id': self.post.id})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.METHOD_NOT_ALLOWED)
+        self.assertFalse(self.post.likes.exists())
+
+    def test_like_redirects_back(self):
+        """После лайка возвращаемся на страницу из next или Referer."""
+        url = reverse('posts:post_like', kwargs={'post_id': self.post.id})
+        group_url = reverse('posts:index') + '?page=2'
+        cases = {
+            'next': ({'next': group_url}, {}, group_url),
+            'referer': ({}, {'HTTP_REFERER': group_url}, group_url),
+            'чужой сайт': (
+                {'next': 'https://evil.example/'}, {},
+                reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            ),
+        }
+        for name, (data, headers, expected) in cases.items():
+            with self.subTest(name=name):
+                response = self.client.post(url, data, **headers)
+                self.assertRedirects(
+                    response, expected, fetch_redirect_response=False
+                )
+
+    def test_feed_marks_liked_posts(self):
+        """Лента отмечает посты, которые лайкнул пользователь."""
+        other_post = Post.objects.create(
+            text='Другой пост', author=self.author
+        )
+        Like.objects.create(user=self.user, post=self.post)
+        response = self.client.get(reverse('posts:index'))
+        liked = {
+            post.pk: post.is_liked for post in response.context['page_obj']
+        }
+        self.assertEqual(liked, {self.post.pk: True, other_post.pk: False})
+
+    def test_index_shows_fresh_like_state(self):
+        """После лайка главная сразу показывает новый счётчик."""
+        self.client.get(reverse('posts:index'))
+        self.client.post(
+            reverse('posts:post_like', kwargs={'post_id': self.post.id})
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '♥ 1')
+        self.assertNotContains(response, '♡ 0')
+
+    def test_index_forms_carry_own_csrf_token(self):
+        """Второй браузер того же пользователя получает свой CSRF-токен."""
+        first = Client(enforce_csrf_checks=True)
+        second = Client(enforce_csrf_checks=True)
+        for client in (first, second):
+            client.force_login(self.user)
+            page = client.get(reverse('posts:index')).content.decode()
+        token = re.search(
+            r'name="csrfmiddlewaretoken" value="([^"]+)"', page
+        ).group(1)
+        response = second.post(
+            reverse('posts:post_like', kwargs={'post_id': self.post.id}),
+            {'csrfmiddlewaretoken': token},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertTrue(self.post.likes.filter(user=self.user).exists())
+
+
+class ProfileCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='User')
+        cls.author = User.objects.create_user(username='Author')
+        for _ in range(3):
+            Post.objects.create(text='Тестовый пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:profile', kwargs={'username': 'Author'})
+
+    def test_profile_with_warm_cache_runs_one_query(self):
+        """С прогретым кэшем профиль читает из базы только страницу постов."""
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['posts_count'], 3)
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+
+    def test_login_keeps_profile_summary(self):
+        """Запись last_login при входе не сбрасывает шапку профиля."""
+        self.client.get(self.url)
+        self.author.set_password('pass')
+        self.author.save()
+        self.client.get(self.url)
+        self.assertTrue(self.client.login(username='Author', password='pass'))
+        self.assertIsNotNone(cache.get(author_summary_key('Author')))
+
+    def test_renamed_author_summary_invalidated(self):
+        """После смены имени старый адрес профиля отвечает 404."""
+        self.client.get(self.url)
+        self.author.username = 'Renamed'
+        self.author.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_profile_summary_invalidated(self):
+        """Новый пост и подписка обновляют шапку профиля."""
+        self.client.get(self.url)
+        Post.objects.create(text='Ещё пост', author=self.author)
+        Follow.objects.create(user=self.user, author=self.author)
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['posts_count'], 4)
+        self.assertEqual(response.context['followers_count'], 1)
+        self.assertTrue(response.context['following'])
+
+    def test_follow_state_is_versioned(self):
+        """Подписка и отписка сразу видны в кэшированном наборе авторов."""
+        self.client.force_login(self.user)
+        follow_url = reverse(
+            'posts:profile_follow', kwargs={'username': 'Author'}
+        )
+        unfollow_url = reverse(
+            'posts:profile_unfollow', kwargs={'username': 'Author'}
+        )
+        self.assertNotIn(self.author.pk, followed_author_ids(self.user))
+        self.client.get(follow_url)
+        self.client.get(follow_url)
+        self.assertIn(self.author.pk, followed_author_ids(self.user))
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 1)
+        self.client.get(unfollow_url)
+        self.assertNotIn(self.author.pk, followed_author_ids(self.user))
+
+    def test_unfollow_queries(self):
+        """Отписка читает подписку и удаляет её, автора не догружает."""
+        author = User.objects.get(username='Author')
+        Follow.objects.create(user=self.user, author=author)
+        self.client.get(self.url)
+        with self.assertNumQueries(2):
+            unfollow_author(self.user, author)
+        self.assertIsNone(cache.get(author_summary_key('Author')))
+        self.assertNotIn(author.pk, followed_author_ids(self.user))
+
+
+class GroupDirectoryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Shakespeare')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_group',
+            description='Тестовое описание',
+        )
+        Post.objects.create(author=cls.user, text='Пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_group_directory_shows_summary(self):
+        """Каталог групп показывает число постов и авторов."""
+        response = self.client.get(reverse('posts:group_directory'))
+        group = response.context['groups'][0]
+        self.assertEqual(group['slug'], self.group.slug)
+        self.assertEqual(group['posts_count'], 1)
+        self.assertEqual(group['authors_count'], 1)
+
+    def test_group_page_with_warm_cache_runs_one_query(self):
+        """С прогретым кэшем страница группы читает только посты."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_group_directory_refreshed_on_new_post(self):
+        """Новый пост обновляет каталог групп."""
+        self.client.get(reverse('posts:group_directory'))
+        Post.objects.create(author=self.user, text='Ещё', group=self.group)
+        response = self.client.get(reverse('posts:group_directory'))
+        self.assertEqual(response.context['groups'][0]['posts_count'], 2)
+
+    def test_group_created_elsewhere_is_found(self):
+        """Группа, созданная мимо сигналов (другим процессом), находится."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        self.client.get(url)
+        Group.objects.bulk_create([
+            Group(title='Новая', slug='new_group', description='Текст')
+        ])
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': 'new_group'})
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_moved_post_updates_both_groups(self):
+        """Перенос поста пересчитывает обе группы каталога и их счётчики."""
+        other = Group.objects.create(
+            title='Другая', slug='other', description='Текст'
+        )
+        self.client.get(reverse('posts:group_directory'))
+        post = Post.objects.get(group=self.group)
+        post.group = other
+        post.save()
+        response = self.client.get(reverse('posts:group_directory'))
+        counts = {
+            group['slug']: group['posts_count']
+            for group in response.context['groups']
+        }
+        self.assertEqual(counts, {'test_group': 0, 'other': 1})
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': 'other'})
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
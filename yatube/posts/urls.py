@@ -1,14 +1,33 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('popular/', views.popular, name='popular'),
+    path('groups/', views.group_directory_view, name='group_directory'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
+    path('posts/<int:post_id>/like/', views.post_like, name='post_like'),
+    path(
+        'posts/<int:post_id>/unlike/',
+        views.post_unlike,
+        name='post_unlike'
+    ),
+    path(
+        'posts/<int:post_id>/live/',
+        views.live_comments,
+        name='live_comments'
+    ),
+    path('live/', views.live_posts, name='live_posts'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
@@ -27,4 +46,18 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('rss/', feeds.index_rss, name='index_rss'),
+    path('atom/', feeds.index_atom, name='index_atom'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.profile_rss,
+        name='profile_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.profile_atom,
+        name='profile_atom'
+    ),
 ]
@@ -1,67 +1,196 @@
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import F
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import is_safe_url
+from django.views.decorators.http import require_POST
 
+from core.pagination import CachedCountPaginator, keyset_paginate
+
+from .caches import (author_summary, follow_author, followed_author_ids,
+                     following_version, get_group_or_404, group_directory,
+                     group_posts_count, unfollow_author)
+from .counters import post_views
+from .feeds import feed_version
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .live import (comment_scopes, feed_scopes, latest_id, new_items,
+                   parse_cursor)
+from .models import Comment, Like, PopularPost, Post
+from .notifications import mark_read
+from .tasks import warm_thumbnails
 
 TEN_POSTS = 10
+COMMENTS_PER_PAGE = 20
+COMMENTS_ORDERING = ('-created', '-id')
+POPULAR_ORDERING = ('-score', '-post_id')
+# Больших лент точно не считаем: навигация показывает «…» вместо хвоста.
+APPROXIMATE_COUNT_ABOVE = 10000
+
+
+def mark_viewer_state(posts, user):
+    """Проставляет постам страницы is_liked и author_followed.
+
+    Лайки читаются одним запросом на страницу, подписки — из кэша.
+    """
+    posts = list(posts)
+    liked = set()
+    followed = followed_author_ids(user)
+    if user.is_authenticated and posts:
+        liked = set(
+            Like.objects.filter(user=user, post__in=posts)
+            .values_list('post_id', flat=True)
+        )
+    for post in posts:
+        post.is_liked = post.pk in liked
+        post.author_followed = post.author_id in followed
 
 
 def index(request):
     template = 'posts/index.html'
-    list_posts = Post.objects.order_by('-pub_date')
-    paginator = Paginator(list_posts, TEN_POSTS)
+    list_posts = (
+        Post.objects.select_related('author', 'group')
+        .order_by('-pub_date')
+    )
+    paginator = CachedCountPaginator(
+        list_posts,
+        TEN_POSTS,
+        cache_key=f'posts:index_count:{feed_version("index")}',
+        approximate_above=APPROXIMATE_COUNT_ABOVE,
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    mark_viewer_state(page_obj, request.user)
+    context = {
+        'page_obj': page_obj,
+        'live_after': latest_id(feed_scopes()),
+    }
+    return render(request, template, context)
+
+
+def popular(request):
+    """Популярное: читает готовый рейтинг, сортировки в запросе нет."""
+    template = 'posts/popular.html'
+    page_obj = keyset_paginate(
+        PopularPost.objects.select_related('post__author', 'post__group'),
+        POPULAR_ORDERING,
+        TEN_POSTS,
+        request.GET.get('cursor'),
+    )
+    page_obj.object_list = [rank.post for rank in page_obj]
+    mark_viewer_state(page_obj, request.user)
     context = {
         'page_obj': page_obj,
+        'popular': True,
     }
     return render(request, template, context)
 
 
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_group_or_404(slug)
     template = 'posts/group_list.html'
-    list_posts = group.posts.order_by('-pub_date')
-    paginator = Paginator(list_posts, TEN_POSTS)
+    list_posts = (
+        Post.objects.filter(group_id=group.pk)
+        .select_related('author', 'group')
+        .order_by('-pub_date')
+    )
+    paginator = CachedCountPaginator(
+        list_posts, TEN_POSTS, count=group_posts_count(group.pk)
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    mark_viewer_state(page_obj, request.user)
     context = {
         'group': group,
         'page_obj': page_obj,
+        'live_after': latest_id(feed_scopes(group_id=group.pk)),
+    }
+    return render(request, template, context)
+
+
+def group_directory_view(request):
+    template = 'posts/group_directory.html'
+    context = {
+        'groups': group_directory(),
     }
     return render(request, template, context)
 
 
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.order_by('-pub_date')
-    paginator = Paginator(posts, TEN_POSTS)
+    summary = author_summary(username)
+    author = summary['author']
+    posts = (
+        Post.objects.filter(author_id=author.pk)
+        .select_related('author', 'group')
+        .order_by('-pub_date')
+    )
+    paginator = CachedCountPaginator(
+        posts, TEN_POSTS, count=summary['posts_count']
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    following = (
-        request.user.is_authenticated
-        and author.following.filter(user=request.user).exists()
-    )
+    mark_viewer_state(page_obj, request.user)
+    following = author.pk in followed_author_ids(request.user)
     context = {
         'author': author,
+        'posts_count': summary['posts_count'],
+        'followers_count': summary['followers_count'],
         'page_obj': page_obj,
         'following': following
     }
     return render(request, template, context)
 
 
+def get_comments_page(request, post_id):
+    """Страница веток: корневые комментарии по курсору и все ответы к ним."""
+    comments = Comment.objects.select_related('author')
+    page = keyset_paginate(
+        comments.filter(post_id=post_id, parent=None),
+        COMMENTS_ORDERING,
+        COMMENTS_PER_PAGE,
+        request.GET.get('cursor'),
+    )
+    replies = {}
+    for reply in comments.replies_to(page.object_list):
+        replies.setdefault(reply.path.split('.', 1)[0], []).append(reply)
+    page.object_list = [
+        comment
+        for root in page.object_list
+        for comment in [root, *replies.get(root.get_path(), [])]
+    ]
+    return page
+
+
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comments.all()
+    # Буфер читается до поста: сброс между ними посчитает просмотры
+    # дважды, но не потеряет их.
+    pending_views = post_views.pending(post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
+    comments = get_comments_page(request, post_id)
     form = CommentForm()
+    post_views.incr(post.pk)
+    mark_viewer_state([post], request.user)
     context = {
         'form': form,
         'post': post,
-        'comments': comments
+        'views': post.views + pending_views + 1,
+        'comments': comments,
+        'reply_to': request.GET.get('reply_to', ''),
+        'live_after': latest_id(comment_scopes(post.pk)),
+    }
+    return render(request, template, context)
+
+
+def post_comments(request, post_id):
+    template = 'posts/includes/comments.html'
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    context = {
+        'post': post,
+        'comments': get_comments_page(request, post_id)
     }
     return render(request, template, context)
 
@@ -73,6 +202,7 @@ def post_create(request):
         post = form.save(False)
         post.author = request.user
         post.save()
+        warm_thumbnails.delay(post.pk)
         return redirect('posts:profile', request.user)
     return render(request, 'posts/create_post.html', {'form': form})
 
@@ -90,6 +220,8 @@ def post_edit(request, post_id):
     )
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            warm_thumbnails.delay(post.pk)
         return redirect('posts:post_detail', post.pk)
     context = {
         'is_edit': True,
@@ -107,6 +239,11 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
+        parent_id = request.POST.get('parent', '')
+        if parent_id.isdigit():
+            comment.parent = Comment.objects.filter(
+                post=post, pk=parent_id
+            ).first()
         comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
@@ -114,28 +251,104 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    list_posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(list_posts, TEN_POSTS)
+    mark_read(request.user)
+    followed = followed_author_ids(request.user)
+    list_posts = Post.objects.filter(
+        author_id__in=list(followed)
+    ).select_related('author', 'group')
+    user_id = request.user.pk
+    paginator = CachedCountPaginator(
+        list_posts,
+        TEN_POSTS,
+        cache_key=(
+            f'posts:follow_count:{user_id}:{following_version(user_id)}:'
+            f'{feed_version("index")}'
+        ),
+        approximate_above=APPROXIMATE_COUNT_ABOVE,
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    mark_viewer_state(page_obj, request.user)
     context = {
         'page_obj': page_obj,
+        'live_after': latest_id(feed_scopes(author_ids=followed)),
     }
     return render(request, template, context)
 
 
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = author_summary(username)['author']
     if request.user != author:
-        Follow.objects.get_or_create(user=request.user, author=author)
+        follow_author(request.user, author)
     return redirect('posts:profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
-    follow = Follow.objects.filter(user=request.user, author=author).exists()
-    if follow:
-        Follow.objects.get(user=request.user, author=author).delete()
+    unfollow_author(request.user, author_summary(username)['author'])
     return redirect('posts:profile', username=username)
+
+
+def redirect_back(request, fallback, **kwargs):
+    """Возвращает на страницу из next или Referer, если она с этого сайта."""
+    for url in (request.POST.get('next'), request.META.get('HTTP_REFERER')):
+        if url and is_safe_url(
+            url,
+            allowed_hosts={request.get_host()},
+            require_https=request.is_secure(),
+        ):
+            return redirect(url)
+    return redirect(fallback, **kwargs)
+
+
+@require_POST
+@login_required
+def post_like(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    with transaction.atomic():
+        _, created = Like.objects.get_or_create(user=request.user, post=post)
+        if created:
+            Post.objects.filter(pk=post_id).update(
+                likes_count=F('likes_count') + 1
+            )
+    return redirect_back(request, 'posts:post_detail', post_id=post_id)
+
+
+@require_POST
+@login_required
+def post_unlike(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=request.user, post=post).delete()
+        if deleted:
+            Post.objects.filter(pk=post_id).update(
+                likes_count=F('likes_count') - 1
+            )
+    return redirect_back(request, 'posts:post_detail', post_id=post_id)
+
+
+def live_posts(request):
+    """JSON для опроса: сколько новых постов в ленте с курсора after."""
+    posts = Post.objects.all()
+    scopes = feed_scopes()
+    group_slug = request.GET.get('group')
+    if group_slug:
+        group = get_group_or_404(group_slug)
+        posts = posts.filter(group_id=group.pk)
+        scopes = feed_scopes(group_id=group.pk)
+    elif request.GET.get('follow') and request.user.is_authenticated:
+        followed = followed_author_ids(request.user)
+        posts = posts.filter(author_id__in=list(followed))
+        scopes = feed_scopes(author_ids=followed)
+    return JsonResponse(new_items(posts, scopes, parse_cursor(request)))
+
+
+def live_comments(request, post_id):
+    """JSON для опроса: сколько новых комментариев под постом."""
+    get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    return JsonResponse(new_items(
+        Comment.objects.filter(post_id=post_id),
+        comment_scopes(post_id),
+        parse_cursor(request),
+    ))
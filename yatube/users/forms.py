@@ -1,10 +1,73 @@
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import (AuthenticationForm, PasswordResetForm,
+                                       UserCreationForm)
+from django.core.exceptions import ValidationError
+
+from core.ratelimit import TokenBucket
+
+from .mail import queue_email
+from .tasks import send_queued_email
 
 User = get_user_model()
 
+# С одного адреса 20 попыток подряд, дальше одна в три секунды.
+LOGIN_IP_BUCKET = TokenBucket('login-ip', capacity=20, refill_rate=1 / 3)
+# На одну учётную запись с одного адреса 5 попыток подряд, дальше одна
+# в минуту. Ключ включает адрес, иначе любой, кто знает имя, мог бы
+# не пускать владельца в аккаунт.
+LOGIN_USERNAME_BUCKET = TokenBucket(
+    'login-username', capacity=5, refill_rate=1 / 60
+)
+
 
 class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class RateLimitedAuthenticationForm(AuthenticationForm):
+    """Форма входа, которая проверяет лимит попыток до хеширования пароля."""
+
+    error_messages = {
+        **AuthenticationForm.error_messages,
+        'throttled': 'Слишком много попыток входа. Повторите позже.',
+    }
+
+    def client_ip(self):
+        if self.request is None:
+            return None
+        return self.request.META.get('REMOTE_ADDR')
+
+    def clean(self):
+        username = (self.cleaned_data.get('username') or '').lower()
+        ip = self.client_ip()
+        if ip and not LOGIN_IP_BUCKET.consume(ip):
+            raise ValidationError(
+                self.error_messages['throttled'], code='throttled'
+            )
+        username_key = f'{username}:{ip}'
+        if username and not LOGIN_USERNAME_BUCKET.consume(username_key):
+            raise ValidationError(
+                self.error_messages['throttled'], code='throttled'
+            )
+        cleaned_data = super().clean()
+        LOGIN_USERNAME_BUCKET.reset(username_key)
+        return cleaned_data
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Сброс пароля без SMTP в запросе: письмо уходит в очередь."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        queue_email(
+            subject_template_name,
+            email_template_name,
+            context,
+            to_email,
+            from_email=from_email,
+            html_template=html_email_template_name,
+        )
+        send_queued_email.delay()
@@ -0,0 +1,130 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+User = get_user_model()
+
+MAIL_BATCH = 100
+# Письма упавшего отправителя снова уходят в работу по истечении аренды.
+MAIL_LEASE = timedelta(minutes=5)
+# Отправленные письма без контекста хранятся сутки для разбора проблем.
+SENT_RETENTION = timedelta(days=1)
+
+
+def queue_email(subject_template, body_template, context, to_email,
+                from_email=None, html_template=None):
+    """Кладёт письмо в очередь; пользователь в контексте хранится по id."""
+    context = dict(context)
+    user = context.pop('user', None)
+    if user is not None:
+        context['user_id'] = user.pk
+    QueuedEmail.objects.create(
+        to_email=to_email,
+        from_email=from_email or '',
+        subject_template=subject_template,
+        body_template=body_template,
+        html_template=html_template or '',
+        context=json.dumps(context, cls=DjangoJSONEncoder),
+    )
+
+
+def claim_emails(limit):
+    """Арендует письма из очереди, как core.tasks.claim_tasks задачи."""
+    now = timezone.now()
+    available = Q(sent_at__isnull=True) & (
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    )
+    candidates = (
+        QueuedEmail.objects.filter(available)
+        .order_by('pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+    claimed = []
+    for pk in candidates:
+        updated = QueuedEmail.objects.filter(available, pk=pk).update(
+            locked_until=now + MAIL_LEASE
+        )
+        if updated:
+            claimed.append(pk)
+    return claimed
+
+
+def mark_sent(email):
+    """Отмечает письмо отправленным и стирает контекст со ссылками."""
+    QueuedEmail.objects.filter(pk=email.pk).update(
+        sent_at=timezone.now(), locked_until=None, context=''
+    )
+
+
+def purge_sent():
+    QueuedEmail.objects.filter(
+        sent_at__lt=timezone.now() - SENT_RETENTION
+    ).delete()
+
+
+def render_message(email, templates, users, connection):
+    context = json.loads(email.context)
+    user_id = context.pop('user_id', None)
+    if user_id is not None:
+        context['user'] = users.get(user_id)
+
+    def render(name):
+        if name not in templates:
+            templates[name] = get_template(name)
+        return templates[name].render(context)
+
+    message = EmailMultiAlternatives(
+        subject=''.join(render(email.subject_template).splitlines()),
+        body=render(email.body_template),
+        from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[email.to_email],
+        connection=connection,
+    )
+    if email.html_template:
+        message.attach_alternative(render(email.html_template), 'text/html')
+    return message
+
+
+def send_queued(batch_size=MAIL_BATCH):
+    """Отправляет очередь пакетами через одно соединение.
+
+    Шаблоны загружаются один раз на пакет, а письма отмечаются
+    отправленными по одному, поэтому сбой посреди пакета не повторит уже
+    ушедшие. Неотправленные письма пакета сразу возвращаются в очередь,
+    а ошибка уходит в задачу на повтор.
+    """
+    sent_total = 0
+    with get_connection() as connection:
+        while True:
+            pks = claim_emails(batch_size)
+            if not pks:
+                break
+            emails = QueuedEmail.objects.filter(pk__in=pks).order_by('pk')
+            user_ids = {
+                json.loads(email.context).get('user_id') for email in emails
+            }
+            users = User.objects.in_bulk(user_ids - {None})
+            templates = {}
+            try:
+                for email in emails:
+                    connection.send_messages([
+                        render_message(email, templates, users, connection)
+                    ])
+                    mark_sent(email)
+                    sent_total += 1
+            except Exception:
+                QueuedEmail.objects.filter(
+                    pk__in=pks, sent_at__isnull=True
+                ).update(locked_until=None)
+                raise
+    purge_sent()
+    return sent_total
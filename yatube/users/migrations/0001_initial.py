@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='Получатель')),
+                ('from_email', models.CharField(blank=True, max_length=254, verbose_name='Отправитель')),
+                ('subject_template', models.CharField(max_length=200, verbose_name='Шаблон темы')),
+                ('body_template', models.CharField(max_length=200, verbose_name='Шаблон текста')),
+                ('html_template', models.CharField(blank=True, max_length=200, verbose_name='Шаблон HTML')),
+                ('context', models.TextField(verbose_name='Контекст в JSON')),
+                ('sent_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Отправлено')),
+            ],
+            options={
+                'verbose_name': 'Письмо в очереди',
+                'verbose_name_plural': 'Письма в очереди',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedemail',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Аренда отправителя до'),
+        ),
+        migrations.AlterField(
+            model_name='queuedemail',
+            name='context',
+            field=models.TextField(blank=True, verbose_name='Контекст в JSON'),
+        ),
+    ]
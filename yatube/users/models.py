@@ -0,0 +1,38 @@
+from django.db import models
+
+from core.models import CreatedModel
+
+
+class QueuedEmail(CreatedModel):
+    """Письмо в очереди: шаблоны и контекст, отрисовка при отправке.
+
+    После отправки контекст (в нём ссылка сброса пароля) стирается.
+    """
+    to_email = models.EmailField('Получатель')
+    from_email = models.CharField('Отправитель', max_length=254, blank=True)
+    subject_template = models.CharField('Шаблон темы', max_length=200)
+    body_template = models.CharField('Шаблон текста', max_length=200)
+    html_template = models.CharField(
+        'Шаблон HTML',
+        max_length=200,
+        blank=True
+    )
+    context = models.TextField('Контекст в JSON', blank=True)
+    locked_until = models.DateTimeField(
+        'Аренда отправителя до',
+        null=True,
+        blank=True
+    )
+    sent_at = models.DateTimeField(
+        'Отправлено',
+        null=True,
+        blank=True,
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Письма в очереди'
+
+    def __str__(self):
+        return f'{self.to_email}: {self.subject_template}'
@@ -0,0 +1,8 @@
+from core.tasks import task
+
+from . import mail
+
+
+@task
+def send_queued_email():
+    mail.send_queued()
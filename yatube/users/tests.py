@@ -0,0 +1,194 @@
+from datetime import timedelta
+from http import HTTPStatus
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from users.mail import SENT_RETENTION, claim_emails, queue_email, send_queued
+from users.models import QueuedEmail
+
+User = get_user_model()
+
+
+class LoginViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', password='secret-pass-42'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def login(self, password, username='auth', ip='127.0.0.1'):
+        return self.guest_client.post(
+            reverse('users:login'),
+            {'username': username, 'password': password},
+            REMOTE_ADDR=ip,
+        )
+
+    def test_login_redirects(self):
+        """Верный пароль перенаправляет на главную."""
+        response = self.login('secret-pass-42')
+        self.assertRedirects(response, reverse('posts:index'))
+
+    def test_username_is_throttled(self):
+        """После пяти ошибок вход блокируется даже с верным паролем."""
+        for _ in range(5):
+            response = self.login('wrong')
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = self.login('secret-pass-42')
+        self.assertEqual(
+            response.status_code, HTTPStatus.TOO_MANY_REQUESTS
+        )
+        self.assertTrue(
+            response.context['form'].has_error('__all__', 'throttled')
+        )
+
+    def test_username_lock_is_per_address(self):
+        """Чужие ошибки с другого адреса не блокируют вход владельцу."""
+        for _ in range(5):
+            self.login('wrong', ip='10.0.0.1')
+        response = self.login('secret-pass-42', ip='10.0.0.2')
+        self.assertRedirects(response, reverse('posts:index'))
+
+    def test_ip_is_throttled_across_usernames(self):
+        """Перебор разных имён с одного адреса тоже ограничивается."""
+        for number in range(20):
+            self.login('wrong', username=f'user{number}')
+        response = self.login('secret-pass-42')
+        self.assertEqual(
+            response.status_code, HTTPStatus.TOO_MANY_REQUESTS
+        )
+
+    def test_success_resets_username_limit(self):
+        """Успешный вход обнуляет счётчик ошибок учётной записи."""
+        for _ in range(4):
+            self.login('wrong')
+        self.login('secret-pass-42')
+        self.guest_client.logout()
+        for _ in range(4):
+            self.login('wrong')
+        response = self.login('secret-pass-42')
+        self.assertRedirects(response, reverse('posts:index'))
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        """Хеш старым хешером заменяется хешем основного при входе."""
+        self.user.password = make_password(
+            'secret-pass-42', hasher='pbkdf2_sha1'
+        )
+        self.user.save(update_fields=['password'])
+        self.login('secret-pass-42')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+
+class QueuedEmailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', email='auth@example.com', password='pass'
+        )
+
+    def queue(self):
+        queue_email(
+            'registration/password_reset_subject.txt',
+            'registration/password_reset_email.html',
+            {'user': self.user, 'uid': 'MQ', 'token': 'token'},
+            self.user.email,
+        )
+
+    def test_password_reset_is_queued(self):
+        """Сброс пароля ставит письмо в очередь, а не шлёт его в запросе."""
+        response = Client().post(
+            reverse('users:password_reset_form'),
+            {'email': 'auth@example.com'},
+        )
+        self.assertRedirects(response, reverse('users:password_reset_done'))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+        self.assertEqual(send_queued(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['auth@example.com'])
+        self.assertIn('/auth/reset/', mail.outbox[0].body)
+        self.assertFalse(
+            QueuedEmail.objects.filter(sent_at__isnull=True).exists()
+        )
+        self.assertEqual(QueuedEmail.objects.get().context, '')
+
+    def test_batches_share_one_connection(self):
+        """Все пакеты очереди уходят через одно соединение."""
+        for _ in range(3):
+            queue_email(
+                'registration/password_reset_subject.txt',
+                'registration/password_reset_email.html',
+                {'user': self.user, 'uid': 'MQ', 'token': 'token'},
+                self.user.email,
+            )
+        with mock.patch(
+            'users.mail.get_connection', wraps=mail.get_connection
+        ) as get_connection:
+            self.assertEqual(send_queued(batch_size=2), 3)
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn('auth', mail.outbox[0].body)
+
+    def test_failed_batch_returns_to_queue(self):
+        """При ошибке отправки письма возвращаются в очередь."""
+        queue_email(
+            'registration/password_reset_subject.txt',
+            'registration/password_reset_email.html',
+            {'user': self.user, 'uid': 'MQ', 'token': 'token'},
+            self.user.email,
+        )
+        with mock.patch.object(
+            EmailBackend, 'send_messages', side_effect=SMTPException
+        ):
+            with self.assertRaises(SMTPException):
+                send_queued()
+        self.assertTrue(QueuedEmail.objects.filter(
+            sent_at__isnull=True, locked_until__isnull=True
+        ).exists())
+
+    def test_partial_failure_keeps_sent_messages(self):
+        """Сбой на втором письме не отправит первое повторно."""
+        for _ in range(2):
+            self.queue()
+        with mock.patch.object(
+            EmailBackend, 'send_messages', side_effect=[1, SMTPException]
+        ):
+            with self.assertRaises(SMTPException):
+                send_queued()
+        self.assertEqual(send_queued(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_expired_lease_is_reclaimed(self):
+        """Письма упавшего отправителя уходят после истечения аренды."""
+        self.queue()
+        self.assertEqual(len(claim_emails(10)), 1)
+        self.assertEqual(send_queued(), 0)
+        QueuedEmail.objects.update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(send_queued(), 1)
+
+    def test_old_sent_messages_are_purged(self):
+        """Отправленные письма удаляются после SENT_RETENTION."""
+        self.queue()
+        send_queued()
+        QueuedEmail.objects.update(
+            sent_at=timezone.now() - SENT_RETENTION - timedelta(seconds=1)
+        )
+        send_queued()
+        self.assertFalse(QueuedEmail.objects.exists())
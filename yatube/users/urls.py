@@ -1,5 +1,4 @@
-from django.contrib.auth.views import (LoginView, LogoutView,
-                                       PasswordChangeDoneView,
+from django.contrib.auth.views import (LogoutView, PasswordChangeDoneView,
                                        PasswordChangeView,
                                        PasswordResetCompleteView,
                                        PasswordResetConfirmView,
@@ -8,6 +7,7 @@ from django.contrib.auth.views import (LoginView, LogoutView,
 from django.urls import path
 
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -20,12 +20,13 @@ urlpatterns = [
     path('signup/', views.SignUp.as_view(), name='signup'),
     path(
         'login/',
-        LoginView.as_view(template_name='users/login.html'),
+        views.RateLimitedLoginView.as_view(),
         name='login'
     ),
     path(
         'password_reset/',
         PasswordResetView.as_view(
+            form_class=QueuedPasswordResetForm,
             template_name='users/password_reset_form.html'
         ),
         name='password_reset_form'
@@ -1,10 +1,25 @@
+from http import HTTPStatus
+
+from django.contrib.auth.views import LoginView
+from django.core.exceptions import NON_FIELD_ERRORS
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 
-from .forms import CreationForm
+from .forms import CreationForm, RateLimitedAuthenticationForm
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+class RateLimitedLoginView(LoginView):
+    form_class = RateLimitedAuthenticationForm
+    template_name = 'users/login.html'
+
+    def form_invalid(self, form):
+        response = super().form_invalid(form)
+        if form.has_error(NON_FIELD_ERRORS, 'throttled'):
+            response.status_code = HTTPStatus.TOO_MANY_REQUESTS
+        return response
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -44,23 +45,48 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
+# Отступы в шаблонах из templates/ срезаются один раз при загрузке
+# шаблона: cached.Loader держит результат до перезапуска процесса, так что
+# правки шаблонов видны после перезапуска runserver. Для шаблонов как
+# есть: 'django.template.loaders.filesystem.Loader'.
+TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'core.loaders.WhitespaceStrippingLoader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                'core.context_processors.year.year'
+                'core.context_processors.year.year',
+                'core.context_processors.notifications.unread_notifications',
             ],
         },
     },
 ]
 
+# Карточки постов в лентах можно рендерить через Jinja2 (pip install Jinja2):
+# шаблоны лежат в jinja2/, окружение — core.jinja2.environment.
+POSTS_JINJA2 = False
+
+if POSTS_JINJA2:
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [os.path.join(BASE_DIR, 'jinja2')],
+        'OPTIONS': {
+            'environment': 'core.jinja2.environment',
+        },
+    })
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
@@ -85,6 +111,17 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Первый хешер используется для новых паролей, остальные только проверяют
+# старые хеши. При входе Django сам перехеширует пароль, если хеш создан
+# другим хешером или с другим числом итераций. Чтобы перейти на Argon2 или
+# bcrypt, установите argon2-cffi или bcrypt и поставьте нужный хешер первым.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
 LANGUAGE_CODE = 'ru'
 
 TIME_ZONE = 'UTC'
@@ -97,17 +134,30 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# collectstatic пишет хешированные имена и сжатые копии, в продакшене
+# их отдаёт core.static.StaticFilesApp из yatube/wsgi.py.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Адрес сайта для ссылок в письмах, которые отправляются вне запроса.
+SITE_URL = 'http://localhost'
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Медиа отдаёт core.views.serve_media. За nginx укажите 'x-accel-redirect'
+# и internal-location с префиксом MEDIA_ACCEL_REDIRECT_PREFIX, за Apache
+# с mod_xsendfile — 'x-sendfile'. None — файл отдаёт сам Django.
+MEDIA_SENDFILE_BACKEND = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Файлы с этими префиксами видны только вошедшим пользователям.
+MEDIA_PRIVATE_PREFIXES = []
 
 CACHES = {
     'default': {
@@ -115,6 +165,24 @@ CACHES = {
     }
 }
 
+# cached_db читает сессии из кэша, но только общий для всех процессов
+# кэш (memcached, Redis) видит выход пользователя в другом worker. С
+# LocMemCache у каждого процесса своя копия, поэтому сессии хранятся в
+# базе. Для сессий без обращений к хранилищу можно указать
+# 'django.contrib.sessions.backends.signed_cookies'.
+SHARED_CACHE = CACHES['default']['BACKEND'] != (
+    'django.core.cache.backends.locmem.LocMemCache'
+)
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.cached_db' if SHARED_CACHE
+    else 'django.contrib.sessions.backends.db'
+)
+SESSION_CACHE_ALIAS = 'default'
+
+# debug_toolbar ищет свои шаблоны через APP_DIRS, а у нас вместо него
+# загрузчик app_directories в TEMPLATE_LOADERS: шаблоны панели находятся.
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ] 
@@ -1,7 +1,8 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import serve_media
 
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
@@ -12,12 +13,14 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
-    path('about/', include('about.urls', namespace='about'))
+    path('about/', include('about.urls', namespace='about')),
+    re_path(
+        rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$",
+        serve_media,
+        name='media'
+    ),
 ]
 
 if settings.DEBUG:
     import debug_toolbar
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
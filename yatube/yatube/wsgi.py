@@ -2,6 +2,10 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from core.counters import start_background_flush
+from core.static import StaticFilesApp
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
-application = get_wsgi_application()
+start_background_flush()
+application = StaticFilesApp(get_wsgi_application())